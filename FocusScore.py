@@ -1,12 +1,13 @@
-import math
-import json
+import sys
+import queue
 import subprocess
 import base64
 import io
+import threading
+from collections import deque
 from typing import List, Dict, Any, Tuple
-import matplotlib.pyplot as plt
-import pandas as pd
 import numpy as np
+import orjson
 from datetime import datetime
 
 # Import crucial functions from face_track.py for enhanced metrics
@@ -14,16 +15,26 @@ from face_track import (
     compute_average_ear, 
     normalize_ear, 
     update_blink_metrics,
-    estimate_head_orientation,
-    rotation_matrix_to_euler_angles,
-    HEAD_POSE_LANDMARKS,
-    MODEL_POINTS
+    estimate_head_orientation
 )
 
 
 # -------------------------
 # 1) Focus score calculator
 # -------------------------
+# More nuanced and balanced weights
+W_FACE = 0.25      # Face presence (reduced from 0.35)
+W_GAZE = 0.25      # Gaze direction (reduced from 0.30)
+W_EYES = 0.20      # Eye openness
+W_HEAD = 0.15      # Head position (increased from 0.10)
+W_BLINK = 0.08     # Blink rate (increased from 0.03)
+W_TYPING = 0.07    # Typing activity (increased from 0.02)
+
+# More nuanced gaze scoring - less volatile
+GAZE_SCORES = {"forward": 1.0, "down": 0.9, "up": 0.9, "left": 0.8, "right": 0.8}  # Less harsh differences
+DEFAULT_GAZE_SCORE = 0.8  # Higher default
+
+
 def compute_focus_score(
     face_present: bool,
     eyes_open_ratio: float,
@@ -42,39 +53,35 @@ def compute_focus_score(
     Return a smooth focus score (0-100).
     Improved version with more forgiving scoring and better recovery.
     """
-    # More nuanced and balanced weights
-    w_face = 0.25      # Face presence (reduced from 0.35)
-    w_gaze = 0.25      # Gaze direction (reduced from 0.30)
-    w_eyes = 0.20      # Eye openness 
-    w_head = 0.15      # Head position (increased from 0.10)
-    w_blink = 0.08     # Blink rate (increased from 0.03)
-    w_typing = 0.07    # Typing activity (increased from 0.02)
+    # No face: the other sub-scores are meaningless, so just decay toward 0
+    # at the same rate (alpha=0.15) as the normal decline path.
+    if not face_present:
+        focus_score = (1.0 - 0.15) * prev_score
+        return round(0.0 if focus_score < 0.0 else 100.0 if focus_score > 100.0 else focus_score, 2)
 
     # Normalize sub-scores (0..1)
-    face_score = 1.0 if face_present else 0.0
+    face_score = 1.0
 
     # More nuanced eye scoring
-    eye_score = float(max(0.0, min(1.0, eyes_open_ratio)))
+    eye_score = 0.0 if eyes_open_ratio < 0.0 else 1.0 if eyes_open_ratio > 1.0 else eyes_open_ratio
     if eyes_closed_duration > 3.0:  # Eyes closed for 3+ seconds
         eye_score = max(0.6, eye_score - 0.2)  # Less harsh penalty, min 0.6 instead of 0.5
 
-    # More nuanced gaze scoring - less volatile
-    gaze_map = {"forward": 1.0, "down": 0.9, "up": 0.9, "left": 0.8, "right": 0.8}  # Less harsh differences
-    gaze_score = gaze_map.get(gaze_direction, 0.8)  # Higher default
+    gaze_score = GAZE_SCORES.get(gaze_direction, DEFAULT_GAZE_SCORE)
     # Gentle gaze away penalty
-    gaze_away_penalty = float(max(0.0, min(0.25, gaze_away_ratio)))  # Max 25% penalty (reduced)
+    gaze_away_penalty = 0.0 if gaze_away_ratio < 0.0 else 0.25 if gaze_away_ratio > 0.25 else gaze_away_ratio  # Max 25% penalty (reduced)
     gaze_score *= (1.0 - gaze_away_penalty)
 
     # More balanced head movement scoring - less sensitive
     head_score = 1.0 - min(abs(head_yaw) / 120.0, 0.5)  # 120° tolerance, max 50% penalty (reduced)
     # Gentle pitch penalty
     if head_pitch < -45:  # Looking down significantly
-        head_score = max(0.6, head_score - 0.15)  # Gentler penalty, min 0.6
-    head_score = max(0.6, min(1.0, head_score))  # Higher minimum head score of 0.6
+        head_score -= 0.15  # Gentler penalty
+    head_score = max(0.6, head_score)  # Higher minimum head score of 0.6 (never exceeds 1.0)
 
     # Simplified blink scoring - less sensitive
+    # (capping the penalty at 0.3 already keeps the minimum blink score at 0.7)
     blink_score = 1.0 - min(abs(blink_rate - 20.0) / 80.0, 0.3)  # Even more forgiving range
-    blink_score = max(0.7, blink_score)  # Higher minimum blink score
 
     # Typing score with moderate baseline
     if typing_active:
@@ -83,36 +90,33 @@ def compute_focus_score(
         typing_score = 0.6  # Moderate baseline when not typing
 
     weighted_sum = (
-        w_face * face_score +
-        w_gaze * gaze_score +
-        w_eyes * eye_score +
-        w_head * head_score +
-        w_blink * blink_score +
-        w_typing * typing_score
+        W_FACE * face_score +
+        W_GAZE * gaze_score +
+        W_EYES * eye_score +
+        W_HEAD * head_score +
+        W_BLINK * blink_score +
+        W_TYPING * typing_score
     )
 
     # Much slower, more gradual EMA smoothing
     raw_score = weighted_sum * 100.0
-    
-    # Very conservative adaptive smoothing for slow changes
-    if raw_score > prev_score:
-        alpha = 0.2  # Very slow improvement (was 0.6)
-    else:
-        alpha = 0.15  # Very slow decline (was 0.5)
-    
-    focus_score = (1.0 - alpha) * float(prev_score) + alpha * raw_score
-    
+
+    # Very conservative adaptive smoothing for slow changes:
+    # very slow improvement (was 0.6), very slow decline (was 0.5)
+    alpha = 0.2 if raw_score > prev_score else 0.15
+    focus_score = (1.0 - alpha) * prev_score + alpha * raw_score
+
     # Reduce bonuses to prevent sudden jumps
     if focus_score > 85 and prev_score > 80:
         focus_score = min(100.0, focus_score + 0.5)  # Tiny sustained bonus (was 1.5)
-    
+
     # Remove the high performance boost entirely to prevent jumps
     # if focus_score > 85:
     #     boost_factor = min(3.0, (focus_score - 85) * 0.3)
     #     focus_score = min(100.0, focus_score + boost_factor)
     #     print(f"🔧 After high performance boost: {focus_score:.1f}")
-    
-    focus_score = max(0.0, min(100.0, focus_score))
+
+    focus_score = 0.0 if focus_score < 0.0 else 100.0 if focus_score > 100.0 else focus_score
     return round(focus_score, 2)
 
 
@@ -240,6 +244,13 @@ def compute_focus_score_with_landmarks(landmarks_array, frame_shape, gaze_direct
 # -------------------------
 # 2) Chart generator (PNG + base64)
 # -------------------------
+# Figure/axes are created once and cleared between calls; the lock keeps
+# concurrent requests from drawing on the shared axes at the same time.
+_CHART_FIG = None
+_CHART_AX = None
+_CHART_LOCK = threading.Lock()
+
+
 def generate_focus_chart_base64(focus_data: List[Dict[str, Any]], dpi: int = 120) -> Tuple[str, bytes]:
     """
     - focus_data: list of {'timestamp': 'HH:MM:SS', 'focus_score': float}
@@ -249,45 +260,57 @@ def generate_focus_chart_base64(focus_data: List[Dict[str, Any]], dpi: int = 120
     if not focus_data:
         raise ValueError("focus_data is empty")
 
-    df = pd.DataFrame(focus_data)
-    # ensure chronological
-    df = df.copy()
+    global _CHART_FIG, _CHART_AX
+
     try:
         # If timestamp strings, keep as labels; do not convert to datetime to keep tick labels readable
-        x = list(df["timestamp"])
-    except Exception:
-        x = list(range(len(df)))
-
-    y = list(df["focus_score"])
-
-    fig, ax = plt.subplots(figsize=(10, 4), dpi=dpi)
-    ax.plot(x, y, linewidth=2)
-    ax.set_title("Focus Score — Session")
-    ax.set_xlabel("Time")
-    ax.set_ylabel("Focus Score (0–100)")
-    ax.set_ylim(0, 100)
-    ax.grid(alpha=0.4, linestyle="--")
-    # reduce x-ticks if too many
-    if len(x) > 30:
-        step = max(1, len(x) // 20)
-        for label in ax.xaxis.get_ticklabels()[::step]:
-            label.set_rotation(45)
-    else:
-        for label in ax.xaxis.get_ticklabels():
-            label.set_rotation(45)
-
-    fig.tight_layout()
-
-    # in-memory PNG
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png")
-    plt.close(fig)
-    buf.seek(0)
-    png_bytes = buf.read()
-    b64 = base64.b64encode(png_bytes).decode("ascii")
+        x = [d["timestamp"] for d in focus_data]
+    except KeyError:
+        x = list(range(len(focus_data)))
+
+    y = [d["focus_score"] for d in focus_data]
+
+    with _CHART_LOCK:
+        if _CHART_FIG is None:
+            # plain Agg canvas: no pyplot figure manager in the server process.
+            # matplotlib is imported on the first chart only, not by every importer of this module
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            _CHART_FIG = Figure(figsize=(10, 4), dpi=dpi)
+            FigureCanvasAgg(_CHART_FIG)
+            _CHART_AX = _CHART_FIG.subplots()
+        else:
+            _CHART_AX.clear()
+            _CHART_FIG.set_dpi(dpi)
+        fig, ax = _CHART_FIG, _CHART_AX
+
+        ax.plot(x, y, linewidth=2)
+        ax.set_title("Focus Score — Session")
+        ax.set_xlabel("Time")
+        ax.set_ylabel("Focus Score (0–100)")
+        ax.set_ylim(0, 100)
+        ax.grid(alpha=0.4, linestyle="--")
+        # reduce x-ticks if too many
+        if len(x) > 30:
+            step = max(1, len(x) // 20)
+            for label in ax.xaxis.get_ticklabels()[::step]:
+                label.set_rotation(45)
+        else:
+            for label in ax.xaxis.get_ticklabels():
+                label.set_rotation(45)
+
+        fig.tight_layout()
+
+        # in-memory PNG
+        buf = io.BytesIO()
+        # zlib level 3 is much faster than the default 6 for flat chart images, at a small size cost
+        fig.canvas.print_png(buf, pil_kwargs={"compress_level": 3, "optimize": False})
+
+    # encode straight from the buffer's memory; b64encode already yields ASCII bytes
+    b64_bytes = base64.b64encode(buf.getbuffer())
     # timestamped filename suggestion
     png_path = f"focus_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-    return png_path, b64.encode("ascii")
+    return png_path, b64_bytes
 
 
 # -------------------------
@@ -301,45 +324,46 @@ def generate_session_stats(focus_data: List[Dict[str, Any]]) -> Dict[str, Any]:
     if not focus_data:
         return {}
 
-    df = pd.DataFrame(focus_data)
-    scores = df["focus_score"].astype(float).values
-    times = df["timestamp"].tolist()
+    scores = np.fromiter((d["focus_score"] for d in focus_data), dtype=np.float64, count=len(focus_data))
+    times = [d["timestamp"] for d in focus_data]
 
-    deltas = np.diff(scores, prepend=scores[0])
-    ups = deltas[deltas > 0]
-    downs = deltas[deltas < 0]
+    deltas = np.empty_like(scores)
+    deltas[0] = 0.0
+    np.subtract(scores[1:], scores[:-1], out=deltas[1:])
+    ups = deltas > 0
+    downs = deltas < 0
 
     def count_recoveries(arr, threshold=10.0):
         # number of times a drop of >= threshold is followed later by an increase of >= threshold
-        count = 0
-        for i in range(len(arr) - 1):
-            if arr[i] <= -threshold:
-                # search forward for a corresponding recovery
-                for j in range(i+1, len(arr)):
-                    if arr[j] >= threshold:
-                        count += 1
-                        break
-        return count
+        drops = np.flatnonzero(arr <= -threshold)
+        gains = np.flatnonzero(arr >= threshold)
+        if not gains.size:
+            return 0
+        # a drop has a later recovery iff it happens before the last gain
+        return int(np.searchsorted(drops, gains[-1]))
+
+    min_idx = int(np.argmin(scores))
+    max_idx = int(np.argmax(scores))
 
     stats = {
         "duration_seconds": len(scores),
         "average_focus": float(np.mean(scores)),
         "median_focus": float(np.median(scores)),
         "std_focus": float(np.std(scores)),
-        "min_focus": float(np.min(scores)),
-        "min_focus_time": times[int(np.argmin(scores))] if len(times) else None,
-        "max_focus": float(np.max(scores)),
-        "max_focus_time": times[int(np.argmax(scores))] if len(times) else None,
+        "min_focus": float(scores[min_idx]),
+        "min_focus_time": times[min_idx],
+        "max_focus": float(scores[max_idx]),
+        "max_focus_time": times[max_idx],
         "first_score": float(scores[0]),
         "last_score": float(scores[-1]),
-        "total_up_changes": int(np.sum(ups > 0)),
-        "total_down_changes": int(np.sum(downs < 0)),
-        "sum_positive_deltas": float(np.sum(ups)) if ups.size else 0.0,
-        "sum_negative_deltas": float(np.sum(downs)) if downs.size else 0.0,
-        "largest_single_drop": float(np.min(deltas)),
-        "largest_single_gain": float(np.max(deltas)),
+        "total_up_changes": int(np.count_nonzero(ups)),
+        "total_down_changes": int(np.count_nonzero(downs)),
+        "sum_positive_deltas": float(deltas[ups].sum()),
+        "sum_negative_deltas": float(deltas[downs].sum()),
+        "largest_single_drop": float(deltas.min()),
+        "largest_single_gain": float(deltas.max()),
         "recovery_moments_est": int(count_recoveries(deltas, threshold=8.0)),
-        "focus_time_series": [{"timestamp": t, "score": float(s)} for t, s in zip(times, scores)]
+        "focus_time_series": [{"timestamp": t, "score": s} for t, s in zip(times, scores.tolist())]
     }
     return stats
 
@@ -347,6 +371,88 @@ def generate_session_stats(focus_data: List[Dict[str, Any]]) -> Dict[str, Any]:
 # -------------------------
 # 4) Trigger nudge (send JSON via stdin)
 # -------------------------
+# Last stderr lines of a nudge worker kept for its error message
+STDERR_TAIL_LINES = 50
+
+
+class NudgeWorker:
+    """
+    Long-lived `nudge.py serve` process, so each nudge skips interpreter startup
+    and the openai/dotenv imports. Requests go to stdin as b"<length>\n<json>"
+    over binary pipes; every request gets exactly one line back on stdout.
+    stderr is drained on its own thread and reported if the worker exits.
+    """
+
+    def __init__(self, nudge_script_path: str):
+        self.nudge_script_path = nudge_script_path
+        self.proc = None
+        self.lines = None
+        self.stderr_lines = None
+        self.stderr_thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-u", self.nudge_script_path, "serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        # stdout is drained on a thread so request() can time out on a hung worker
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_stdout, args=(self.proc.stdout, self.lines), daemon=True).start()
+        # stderr too, so a chatty worker can't fill the pipe and block; the tail is kept
+        # for the error message if the worker dies (e.g. a traceback at import)
+        self.stderr_lines = deque(maxlen=STDERR_TAIL_LINES)
+        self.stderr_thread = threading.Thread(
+            target=self._read_stderr, args=(self.proc.stderr, self.stderr_lines), daemon=True
+        )
+        self.stderr_thread.start()
+
+    @staticmethod
+    def _read_stdout(stream, lines: queue.Queue):
+        for line in stream:
+            lines.put(line)
+        lines.put(None)  # EOF -> worker exited
+
+    @staticmethod
+    def _read_stderr(stream, lines: deque):
+        for line in stream:
+            lines.append(line)
+
+    def stop(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+    def request(self, payload: bytes, timeout: int = 30) -> str:
+        with self.lock:
+            if self.proc is None or self.proc.poll() is not None:
+                self.start()
+            try:
+                self.proc.stdin.write(b"%d\n" % len(payload))
+                self.proc.stdin.write(payload)
+                self.proc.stdin.flush()
+            except OSError:
+                pass  # worker died; its exit output (if any) is still queued below
+            try:
+                line = self.lines.get(timeout=timeout)
+            except queue.Empty:
+                self.stop()
+                raise TimeoutError(f"nudge worker timed out after {timeout} seconds")
+            if line is None:
+                code = self.proc.wait()
+                self.proc = None
+                self.stderr_thread.join(timeout=1.0)  # pipe is at EOF once the worker is gone
+                stderr = b"".join(self.stderr_lines).decode("utf-8", errors="replace").strip()
+                return f"[nudge.py error code {code}] stderr: {stderr}"
+            return line.decode("utf-8", errors="replace").strip()
+
+
+_NUDGE_WORKERS: Dict[str, NudgeWorker] = {}
+
+
 def trigger_nudge_with_session(
     nudge_script_path: str,
     session_stats: Dict[str, Any],
@@ -355,12 +461,12 @@ def trigger_nudge_with_session(
     timeout: int = 30
 ) -> str:
     """
-    Calls `nudge.py` (or other script) and sends a JSON payload on stdin.
+    Sends a JSON payload to a persistent `nudge.py` (or other script) worker, see NudgeWorker.
     Payload contains:
       - session_stats: numeric breakdown (see generate_session_stats)
       - chart_base64: base64 string (PNG)
       - extra_context: any additional keys (e.g., user id)
-    The target script should read stdin and parse the JSON.
+    The target script should implement the `serve` stdin protocol.
     Returns stdout from the called script (the LLM-generated message).
     """
     payload = {
@@ -370,22 +476,15 @@ def trigger_nudge_with_session(
     if extra_context:
         payload["extra_context"] = extra_context
 
-    payload_str = json.dumps(payload)
+    # orjson serializes straight to UTF-8 bytes in C (the worker protocol is length-prefixed bytes).
+    # The options keep what json.dumps accepted: numpy scalars in the stats and
+    # non-str keys in a caller's extra_context
+    payload_bytes = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
     try:
-        proc = subprocess.run(
-            ["python", nudge_script_path],
-            input=payload_str,
-            text=True,
-            capture_output=True,
-            timeout=timeout
-        )
-        stdout = proc.stdout.strip()
-        stderr = proc.stderr.strip()
-        if proc.returncode != 0:
-            return f"[nudge.py error code {proc.returncode}] stderr: {stderr}\nstdout: {stdout}"
+        worker = _NUDGE_WORKERS.get(nudge_script_path)
+        if worker is None:
+            worker = _NUDGE_WORKERS[nudge_script_path] = NudgeWorker(nudge_script_path)
+        stdout = worker.request(payload_bytes, timeout=timeout)
         return stdout or "[nudge.py returned no text]"
     except Exception as e:
         return f"[trigger_nudge exception] {e}"
-
-
-
@@ -10,14 +10,34 @@ The module does **not** depend on any GUI framework – it just uses the
 already‑opened OpenCV capture object.
 """
 
+import os
 import json
 import time
+from functools import lru_cache
 import numpy as np
 from typing import Dict
 import cv2
-from face_tracking_utils import RIGHT_EYE, LEFT_EYE
 from ema_smoother import GazeSmoother
 
+CALIBRATION_PATH = "gaze_calibration_parameters.json"
+# Stored thresholds closer than this to a new calibration are not rewritten.
+CALIBRATION_EPSILON = 1e-4
+
+# FaceMesh only runs on every Nth frame during calibration, and only until a pose
+# has enough samples; the median is just as stable with a few dozen of them.
+CALIBRATION_FRAME_STRIDE = 3
+CALIBRATION_SAMPLES_PER_POSE = 60
+# Only the most recent samples feed the pose median (ring buffer), which also
+# drops the early frames where the eyes are still moving to the new target.
+CALIBRATION_MEDIAN_WINDOW = 32
+# A pose auto-advances once the last N samples are this still on both axes. Only
+# checked after a full median window so a slow reaction to the prompt isn't
+# mistaken for a steady gaze.
+CALIBRATION_CONVERGE_SAMPLES = 15
+CALIBRATION_CONVERGE_STD = 0.01
+# The prompt window is redrawn every Nth frame; keys are still polled every frame.
+CALIBRATION_DISPLAY_EVERY = 3
+
 # -------------------------------------------------------------------------
 # Core calibration routine
 # -------------------------------------------------------------------------
@@ -26,21 +46,22 @@ def calibrate_user(
     face_mesh,
     w: int,
     h: int,
-    get_eye_pts,
-    eye_gaze_vector,
+    get_eyes_pts,
+    eye_gaze_vector_batch,
     smoothing_alpha: float = 0.3,
     font=cv2.FONT_HERSHEY_SIMPLEX,
 ) -> Dict[str, float]:
     """
-    Runs a 5‑step calibration (center, left, right, up, down).
+    Runs a 5‑step calibration (center, left, right, up, down). Each pose
+    advances on Enter, or by itself once the smoothed gaze has settled.
 
     Parameters
     ----------
     cap            : cv2.VideoCapture – already opened.
     face_mesh      : mediapipe FaceMesh object.
     w, h           : frame width/height (pixels).
-    get_eye_pts    : callable(idx_map) → dict of 5 eye landmarks in pixel coordinates.
-    eye_gaze_vector: callable(eye_pts) → np.array([dx, dy]) where 0‑1 are normalized.
+    get_eyes_pts   : callable(lm, w, h) → (2, 5, 2) array of both eyes' landmarks in pixel coordinates.
+    eye_gaze_vector_batch: callable(eyes) → (B, 2) array of [dx, dy] where 0‑1 are normalized.
     font           : OpenCV font used for the on‑screen prompt.
 
     Returns
@@ -68,50 +89,71 @@ def calibrate_user(
 
     smoother = GazeSmoother(alpha=smoothing_alpha)
 
+    # ring of the last (dx, dy) samples for the current pose; reused across poses,
+    # n = samples taken so far this pose.
+    samples = np.empty((CALIBRATION_MEDIAN_WINDOW, 2), dtype=np.float64)
+    frame_idx = 0
+    rgb_buf = None  # reused RGB frame for FaceMesh
+
     for text, _ in prompts:
-        samples_h, samples_v = [], [] # containers for the current pose
+        n = 0
 
         while True:
             ret, frame = cap.read()
             if not ret:
                 break
 
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_mesh.process(rgb)
-
-            if results.multi_face_landmarks:
+            frame_idx += 1
+            if n < CALIBRATION_SAMPLES_PER_POSE and frame_idx % CALIBRATION_FRAME_STRIDE == 0:
+                if rgb_buf is None or rgb_buf.shape != frame.shape:
+                    rgb_buf = np.empty_like(frame)
+                rgb_buf.flags.writeable = True
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+                # Read-only input lets MediaPipe wrap the buffer instead of copying it
+                rgb_buf.flags.writeable = False
+                results = face_mesh.process(rgb_buf)
+            else:
+                results = None
+
+            if results is not None and results.multi_face_landmarks:
                 lm = results.multi_face_landmarks[0].landmark
 
                 # Grab eye points for both eyes using the caller‑provided helper.
-                right_pts = get_eye_pts(RIGHT_EYE, lm, w, h)
-                left_pts  = get_eye_pts(LEFT_EYE,  lm, w, h)
+                eyes = get_eyes_pts(lm, w, h)
 
                 # Average the two eyes → raw (dx, dy)
-                raw_vec = (eye_gaze_vector(right_pts) + eye_gaze_vector(left_pts)) / 2.0
+                raw_vec = eye_gaze_vector_batch(eyes).mean(axis=0)
 
                 # Smooth the vector before we record it
                 smooth_vec = smoother.update(raw_vec)
 
                 # store the smoothed components
-                samples_h.append(float(smooth_vec[0]))
-                samples_v.append(float(smooth_vec[1]))
+                samples[n % CALIBRATION_MEDIAN_WINDOW] = smooth_vec
+                n += 1
+
+                if n >= CALIBRATION_MEDIAN_WINDOW:
+                    recent = samples[np.arange(n - CALIBRATION_CONVERGE_SAMPLES, n) % CALIBRATION_MEDIAN_WINDOW]
+                    if (recent.std(axis=0) < CALIBRATION_CONVERGE_STD).all():
+                        break   # gaze has settled – go to the next pose
 
             # Show instruction on screen.
-            cv2.putText(frame, f"CALIBRATE: {text}", (30, 40), font, 1.2, (0, 255, 255), 2)
-            cv2.imshow("Calibration", frame)
+            if frame_idx % CALIBRATION_DISPLAY_EVERY == 0:
+                cv2.putText(frame, f"CALIBRATE: {text}", (30, 40), font, 1.2, (0, 255, 255), 2)
+                cv2.imshow("Calibration", frame)
 
             user_keyboard_input = cv2.waitKey(1) & 0xFF
             # 13 = carriage return, 10 = line-feed
             if user_keyboard_input == 13 or user_keyboard_input == 10:
-                break       # Go to the next pose
+                break       # Go to the next pose (manual override)
             # 27 = esc
             if user_keyboard_input == 27:
                 raise KeyboardInterrupt
 
         # Keep the median of the collected samples (robust to outliers).
-        if samples_h:
-            horiz_vals.append(np.median(samples_h))
-            vert_vals.append(np.median(samples_v))
+        if n:
+            h_med, v_med = np.median(samples[:min(n, CALIBRATION_MEDIAN_WINDOW)], axis=0)
+            horiz_vals.append(h_med)
+            vert_vals.append(v_med)
 
     # -----------------------------------------------------------------
     # Derive user‑specific thresholds from the measured extremes.
@@ -143,21 +185,53 @@ def calibrate_user(
     }
 
     # Persist the calibration for future runs.
-    with open("gaze_calibration_parameters.json", "w") as f:
-        json.dump(cfg, f, indent=2)
-
-    print("Calibration finished – thresholds saved to gaze_calibration_parameters.json")
+    if save_calibration(cfg):
+        print(f"Calibration finished – thresholds saved to {CALIBRATION_PATH}")
+    else:
+        print(f"Calibration finished – thresholds unchanged, kept {CALIBRATION_PATH}")
     cv2.destroyWindow("Calibration")
     return cfg
 
 
+# -------------------------------------------------------------------------
+# Persistence – atomic write, cached read.
+# -------------------------------------------------------------------------
+@lru_cache(maxsize=1)
+def _read_calibration_file() -> Dict[str, float]:
+    with open(CALIBRATION_PATH, "r") as f:
+        return json.load(f)
+
+
+def save_calibration(cfg: Dict[str, float]) -> bool:
+    """
+    Write *cfg* via a temp file + rename so an interrupted write can't leave a
+    torn JSON behind. Returns False (and writes nothing) if the stored values
+    already match within CALIBRATION_EPSILON.
+    """
+    try:
+        old = _read_calibration_file()
+    except (FileNotFoundError, json.JSONDecodeError):
+        old = None
+    if old is not None and old.keys() == cfg.keys() and all(
+        abs(cfg[k] - old[k]) < CALIBRATION_EPSILON for k in cfg
+    ):
+        return False
+
+    tmp_path = CALIBRATION_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cfg, f, indent=2)
+    os.replace(tmp_path, CALIBRATION_PATH)
+    _read_calibration_file.cache_clear()
+    return True
+
+
 # -------------------------------------------------------------------------
 # Convenience loader – returns defaults if the JSON file is missing.
 # -------------------------------------------------------------------------
 def load_calibration() -> Dict[str, float]:
     try:
-        with open("gaze_calibration_parameters.json", "r") as f:
-            cfg = json.load(f)
+        # copy so callers can't mutate the cached dict
+        cfg = dict(_read_calibration_file())
         print("Loaded saved calibration.")
         return cfg
     except FileNotFoundError:
@@ -1,15 +1,63 @@
+from collections import deque
+
 import numpy as np
 # ----- Exponential moving‑average for a 2‑D vector -----
 class GazeSmoother:
     """EMA smoother for (dx, dy).  alpha ∈ (0,1] – higher = less lag."""
     def __init__(self, alpha: float = 0.3):
         self.alpha = alpha          # larger alpha = less smoothing
+        self.one_minus_alpha = 1.0 - alpha
         self.state = None           # current smoothed (dx, dy)
 
     def update(self, vec):
-        """vec = np.array([dx, dy])"""
+        """vec = np.array([dx, dy]); the returned state array is updated in place on later calls."""
         if self.state is None:
-            self.state = np.asarray(vec, dtype=float)
+            self.state = np.array(vec, dtype=np.float64)
+        else:
+            # plain scalar math – for two elements NumPy dispatch costs more than the arithmetic
+            vx, vy = vec
+            s = self.state
+            s[0] = self.alpha * vx + self.one_minus_alpha * s[0]
+            s[1] = self.alpha * vy + self.one_minus_alpha * s[1]
+        return self.state
+
+# ----- Exponential moving‑average for an N‑D vector -----
+class MultiSmoother:
+    """EMA smoother for several signals sharing one state vector (e.g. dx, dy, pitch, yaw)."""
+    def __init__(self, n: int, alpha: float = 0.3):
+        self.alpha = alpha
+        self.one_minus_alpha = 1.0 - alpha
+        self.state = np.empty(n, dtype=np.float64)
+        self.tmp = np.empty(n, dtype=np.float64)
+        self.initialized = False
+
+    def update(self, vec):
+        """vec = length-n array; returns the state array, updated in place on every call."""
+        if not self.initialized:
+            self.state[:] = vec
+            self.initialized = True
         else:
-            self.state = self.alpha * np.asarray(vec) + (1.0 - self.alpha) * self.state
-        return self.state
\ No newline at end of file
+            # state = alpha*vec + (1-alpha)*state, without temporaries
+            np.multiply(vec, self.alpha, out=self.tmp)
+            np.multiply(self.state, self.one_minus_alpha, out=self.state)
+            np.add(self.state, self.tmp, out=self.state)
+        return self.state
+
+# ----- Moving average over the last N scalar samples -----
+class RollingMean:
+    """Mean of the last `window` samples, kept as a running sum (O(1) per update, no NumPy)."""
+    def __init__(self, window: int = 5):
+        self.samples = deque(maxlen=window)
+        self.total = 0.0
+
+    def update(self, x: float) -> float:
+        """Add a sample and return the mean of the current window."""
+        if len(self.samples) == self.samples.maxlen:
+            self.total -= self.samples[0]
+        self.samples.append(x)
+        self.total += x
+        return self.total / len(self.samples)
+
+    def clear(self):
+        self.samples.clear()
+        self.total = 0.0
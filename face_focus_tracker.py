@@ -5,64 +5,151 @@ and send real-time focus scores to the FocusMind backend.
 """
 
 import argparse
-import math
+import sys
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import queue
 import threading
-from collections import deque
 from typing import Optional, Dict, Any
 
 import cv2
-import mediapipe as mp
 import numpy as np
 
 # Import existing modules
-from ema_smoother import GazeSmoother
-from face_tracking_utils import RIGHT_EYE, LEFT_EYE, get_eye_pts, eye_gaze_vector, landmarks_to_np_array
+from ema_smoother import MultiSmoother
+from face_mesh_process import FaceMeshProcess, create_face_mesh
+from face_tracking_utils import EYE_LANDMARKS, get_eyes_pts, eye_gaze_vector_batch, landmarks_to_np_array
+from face_track import (
+    HEAD_POSE_LANDMARKS, open_video_file,
+    compute_average_ear, normalize_ear, update_blink_metrics, estimate_head_orientation
+)
 from calibration import calibrate_user, load_calibration
-from FocusScore import compute_focus_score, compute_focus_score_with_landmarks
-
-# Face tracking constants
-HEAD_POSE_LANDMARKS = [1, 152, 33, 263, 61, 291]
-LEFT_IRIS_INDICES = [468, 469, 470, 471, 472]
-RIGHT_IRIS_INDICES = [473, 474, 475, 476, 477]
-LEFT_EYE_CORNERS = (33, 133)
-RIGHT_EYE_CORNERS = (362, 263)
-LEFT_EYE_VERTICAL = (159, 145)
-RIGHT_EYE_VERTICAL = (386, 374)
-
-MODEL_POINTS = np.array([
-    (0.0, 0.0, 0.0),        # Nose tip
-    (0.0, -63.6, -12.5),    # Chin
-    (-43.3, 32.7, -26.0),   # Left eye outer corner
-    (43.3, 32.7, -26.0),    # Right eye outer corner
-    (-28.9, -28.9, -24.1),  # Left mouth corner
-    (28.9, -28.9, -24.1),   # Right mouth corner
-], dtype=np.float32)
+from FocusScore import compute_focus_score
+
+# Webcam capture: native backend per platform, MJPG at this resolution (see initialize_camera)
+CAMERA_BACKENDS = {"win32": cv2.CAP_DSHOW, "linux": cv2.CAP_V4L2}
+CAMERA_SIZE = (640, 360)
+
+# Frames wider than this are downscaled (aspect kept) before FaceMesh. Landmarks
+# come back normalized, so they still map onto the full-resolution frame.
+PROCESS_WIDTH = 480
+
+# Frames whose 64x36 grayscale thumbnail differs from the previous one by less than
+# MOTION_THRESHOLD (sum of absolute differences) reuse the last metrics, for at most
+# MOTION_MAX_REUSE frames in a row
+MOTION_THUMB_SIZE = (64, 36)
+MOTION_THRESHOLD = 4000
+MOTION_MAX_REUSE = 5
+
+# OpenCV worker threads. The OpenCV calls here work on CAMERA_SIZE or PROCESS_WIDTH-wide
+# frames, where parallel_for dispatch costs about what it saves, and its pool competes with
+# MediaPipe's inference threads for the same cores; the pipeline threads already overlap the work
+OPENCV_THREADS = 1
+
+# Rate at which frames are analysed (FaceMesh + metrics); the focus score averages over
+# seconds, so analysing every 30 fps camera frame only burns CPU
+PROCESS_FPS = 12
+PROCESS_INTERVAL = 1.0 / PROCESS_FPS
+
+# Focus score levels (descending) that trigger a motivational quote when crossed
+QUOTE_THRESHOLDS = (80, 60, 50, 40, 20)
+
+# Frames between blocking cv2.waitKey(1) calls; other frames use the non-blocking cv2.pollKey()
+KEY_WAIT_EVERY = 10
+
+# HUD layout: HUD_LINES text lines, HUD_LINE_HEIGHT px apart, then the focus bar.
+# Area covered by the text + bar (bar ends at y=360 + border)
+HUD_LINES = 10
+HUD_FIRST_BASELINE = 30
+HUD_LINE_HEIGHT = 30
+HUD_HEIGHT = 364
+HUD_WIDTH = 400
+
+# Per-frame metrics averaged over each update interval before scoring
+AVERAGED_METRICS = ('face_present', 'eyes_open_ratio', 'gaze_away_ratio', 'head_pitch', 'head_yaw', 'blink_rate')
+
+# While the smoothed head pose is turned further than this (|pitch| or |yaw|, degrees) the
+# iris isn't usable for gaze anyway, so the legacy Face-Mesh runs without the iris sub-model
+# (~30% cheaper) and the gaze signal holds its last value until the head comes back
+# within REFINE_HEAD_RESUME. The two are separate FaceMesh instances, so every switch
+# makes the incoming one re-run its face detector; the hysteresis band keeps a pose
+# hovering near the limit from switching (and re-detecting) every frame
+REFINE_HEAD_LIMIT = 30.0
+REFINE_HEAD_RESUME = 25.0
+
+# Landmark dots drawn by draw_overlay, in drawing order: (indices, radius, BGR color)
+FACE_CONTOUR = (10, 151, 9, 8, 168, 6, 148, 176, 149, 150, 136, 172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109)
+OVERLAY_LANDMARK_GROUPS = (
+    # Eye corners/vertical points and mouth corners/center - Green
+    (np.array([159, 145, 386, 374, 33, 133, 362, 263, 61, 291, 13, 14], dtype=np.intp), 2, (0, 255, 0)),
+    # Head pose landmarks - Red
+    (HEAD_POSE_LANDMARKS, 3, (0, 0, 255)),
+    # Every 3rd face contour point (avoids clutter) - Blue
+    (np.array(FACE_CONTOUR[::3], dtype=np.intp), 1, (255, 0, 0)),
+    # Nose tip and bridge - Yellow
+    (np.array([1, 2, 5, 4, 6, 19, 20, 94, 125], dtype=np.intp), 2, (0, 255, 255)),
+    # Outer/inner corner and iris centre of both eyes - Cyan
+    (EYE_LANDMARKS[:, [0, 1, 4]].ravel(), 2, (255, 255, 0)),
+)
+# Same groups as zero-length polyline segments (each index twice): a segment of
+# thickness 2*r rasterizes to exactly the pixels of a filled cv2.circle of radius r.
+# Last field: landmark count the group needs (iris groups are skipped on 468-point frames)
+OVERLAY_DOT_SEGMENTS = tuple(
+    (indices.repeat(2), 2 * radius, color, int(indices.max()) + 1)
+    for indices, radius, color in OVERLAY_LANDMARK_GROUPS
+)
+
+# Pending backend POSTs kept while the backend is slow (oldest dropped beyond this)
+HTTP_QUEUE_SIZE = 8
+HTTP_TIMEOUT = 3.0
+
+
+def put_drop_oldest(q, item):
+    """put_nowait that drops the oldest queued item instead of raising queue.Full"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
 
 class FaceFocusTracker:
     """
     Real-time face tracking focus monitor that integrates with FocusMind backend
     """
     
-    def __init__(self, backend_url="http://localhost:8000", update_interval=2.0, show_video=True, force_calibrate=False):
+    def __init__(self, backend_url="http://localhost:8000", update_interval=2.0, show_video=True, force_calibrate=False,
+                 landmarker_model=None, use_gpu=False, inference_process=False):
         self.backend_url = backend_url
         self.update_interval = update_interval  # seconds between focus score updates
         self.show_video = show_video
         self.force_calibrate = force_calibrate
+        self.landmarker_model = landmarker_model  # face_landmarker.task path -> Tasks API instead of FaceMesh
+        self.use_gpu = use_gpu
+        self.inference_process = inference_process  # run the face model in a worker process
         self.running = False
         
         # Focus tracking state
         self.current_focus_score = 100.0
         self.last_update_time = 0
         self.last_quote_threshold = 100  # Track last threshold that triggered a quote
+        self.next_quote_idx = 0  # First QUOTE_THRESHOLDS entry not yet triggered
         
         # Video capture and MediaPipe
         self.cap = None
+        self.live = True  # webcam (real-time) vs video file, set in initialize_camera
         self.face_mesh = None
+        self.face_mesh_basic = None  # Face-Mesh without iris refinement, used while the head is turned
+        self.head_turned = False  # smoothed head pose beyond REFINE_HEAD_LIMIT (until back within REFINE_HEAD_RESUME)
         self.smoother = None
         self.cfg = None
+        self.gaze_thresholds = None  # (left, right, top, down), set in initialize_camera
         
         # Tracking variables
         self.eyes_closed_start_time = None
@@ -80,11 +167,32 @@ class FaceFocusTracker:
             'last_reset_time': 0.0
         }
         
-        # Rolling buffers for smoothing
-        self.eye_horizontal_history = deque(maxlen=5)
-        self.eye_vertical_history = deque(maxlen=5)
-        self.head_pitch_history = deque(maxlen=5)
-        self.head_yaw_history = deque(maxlen=5)
+        # Smoother input (gaze dx, gaze dy, head pitch, head yaw), filled in place each frame
+        self.signals = np.zeros(4, dtype=np.float64)
+        
+        # Per-frame metrics collected between focus score updates
+        self.reset_metric_accumulators()
+        
+        # Cached HUD raster, redrawn only when its text changes (see draw_overlay)
+        self.hud_key = None
+        self.hud_lines = None
+        self.hud_metrics = None  # metrics dict / focus score the cached hud_text was built from
+        self.hud_score = None
+        self.hud_text = None
+        self.hud_layer = None
+        self.hud_mask = None
+        
+        # Motion gate state (see process_frame)
+        self.prev_tiny = None
+        self.last_metrics = None
+        self.reused_frames = 0
+        
+        # Reused downscaled BGR and RGB frames for MediaPipe (allocated on the first frame)
+        self.small_buf = None
+        self.rgb_buf = None
+        
+        # Reused landmark pixel buffer (478 points with refine_landmarks=True)
+        self.pts_buf = np.empty((478, 2), dtype=np.int32)
         
         # Face tracking data
         self.expression = None
@@ -93,6 +201,27 @@ class FaceFocusTracker:
         self.head_direction = None
         self.gaze_label = ""
         
+        # Pipeline threads: the capture thread hands only the newest frame to the
+        # display loop (maxsize=1, oldest dropped), which passes frames due for analysis to
+        # the inference thread (same policy), and backend POSTs go through http_queue as
+        # (endpoint, payload, success message) so neither loop waits on HTTP.
+        self.frame_queue = queue.Queue(maxsize=1)
+        self.inference_queue = queue.Queue(maxsize=1)
+        self.http_queue = queue.Queue(maxsize=HTTP_QUEUE_SIZE)
+        self.frame_wanted = threading.Event()
+        self.frame_buf = None
+        self.capture_thread = None
+        self.inference_thread = None
+        self.network_thread = None
+        
+        # One keep-alive session for all backend calls instead of a new connection per POST.
+        # Only the network thread posts, to a single backend host: one pool, one live
+        # connection (plus a spare if the backend closes it mid-request)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
         print("🎯 FaceFocusTracker initialized")
         print(f"📡 Backend URL: {self.backend_url}")
         print(f"⏱️ Update interval: {self.update_interval}s")
@@ -100,22 +229,40 @@ class FaceFocusTracker:
     def initialize_camera(self, source=0):
         """Initialize camera and MediaPipe components"""
         try:
-            # Open video source
-            self.cap = cv2.VideoCapture(source)
+            # Open video source. Webcams go through the native backend (DirectShow / V4L2)
+            # and ask for MJPG at CAMERA_SIZE: less USB bandwidth and nothing bigger than
+            # the tracker needs. Files go through FFmpeg with hardware decoding when available;
+            # webcams on other platforms use OpenCV's default backend.
+            if isinstance(source, int) and sys.platform in CAMERA_BACKENDS:
+                self.cap = cv2.VideoCapture(source, CAMERA_BACKENDS[sys.platform])
+                if not self.cap.isOpened():
+                    self.cap = cv2.VideoCapture(source)
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_SIZE[0])
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_SIZE[1])
+            elif isinstance(source, int):
+                self.cap = cv2.VideoCapture(source)
+            else:
+                self.cap = open_video_file(source)
             if not self.cap.isOpened():
                 raise RuntimeError(f"Cannot open video source: {source}")
+            self.live = isinstance(source, int)
+            # Keep the driver queue short so we never process stale frames
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             
-            # Initialize MediaPipe Face-Mesh
-            mp_face_mesh = mp.solutions.face_mesh
-            self.face_mesh = mp_face_mesh.FaceMesh(
-                static_image_mode=False,
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5,
-            )
+            # Initialize MediaPipe: Tasks FaceLandmarker (optionally on GPU) when a model
+            # bundle is given, otherwise the legacy CPU Face-Mesh; optionally in a worker process
+            if self.inference_process:
+                self.face_mesh = FaceMeshProcess(self.landmarker_model, use_gpu=self.use_gpu)
+                print(f"🧠 Face model running in worker process (pid {self.face_mesh.worker.pid})")
+            else:
+                self.face_mesh = create_face_mesh(self.landmarker_model, use_gpu=self.use_gpu)
+                if not self.landmarker_model:
+                    self.face_mesh_basic = create_face_mesh(refine_landmarks=False)
+            if self.landmarker_model:
+                print(f"🧠 Face Landmarker task loaded ({self.face_mesh.delegate} delegate)")
             
-            self.smoother = GazeSmoother(alpha=0.3)
+            self.smoother = MultiSmoother(4, alpha=0.3)
             
             # Try to load existing calibration first, or force calibration if requested
             if self.force_calibrate:
@@ -124,7 +271,7 @@ class FaceFocusTracker:
                     self.cap, self.face_mesh,
                     int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
                     int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-                    get_eye_pts, eye_gaze_vector, smoothing_alpha=0.2
+                    get_eyes_pts, eye_gaze_vector_batch, smoothing_alpha=0.2
                 )
                 print("✅ Calibration completed")
             else:
@@ -138,12 +285,21 @@ class FaceFocusTracker:
                     self.cfg = {
                         "left_thresh": -0.15,
                         "right_thresh": 0.15, 
-                        "up_thresh": -0.10,
+                        "top_thresh": -0.10,
                         "down_thresh": 0.10,
                         "center_x": 0.0,
                         "center_y": 0.0
                     }
                     print("💡 Run with --calibrate flag to perform custom calibration")
+            # Plain tuple of floats for the per-frame gaze_vector_to_label. Missing keys fall
+            # back to the defaults above (older files may still say "up_thresh")
+            cfg = self.cfg
+            self.gaze_thresholds = (
+                float(cfg.get("left_thresh", -0.15)),
+                float(cfg.get("right_thresh", 0.15)),
+                float(cfg.get("top_thresh", cfg.get("up_thresh", -0.10))),
+                float(cfg.get("down_thresh", 0.10)),
+            )
             print("✅ Camera and MediaPipe initialized successfully")
             return True
             
@@ -157,237 +313,342 @@ class FaceFocusTracker:
         # This could be enhanced with more sophisticated analysis
         
         # Check if mouth is open (simple approximation)
-        mouth_top = pts[13]    # Upper lip
-        mouth_bottom = pts[14] # Lower lip
-        mouth_opening = np.linalg.norm(mouth_top - mouth_bottom)
+        # Upper lip (13) and lower lip (14) are adjacent: one slice, plain ints
+        (top_x, top_y), (bottom_x, bottom_y) = pts[13:15].tolist()
+        dx = top_x - bottom_x
+        dy = top_y - bottom_y
         
-        if mouth_opening > 10:  # Threshold for mouth being open
+        if dx * dx + dy * dy > 100:  # Mouth opening > 10 px (compared squared, no sqrt)
             return "talking"
         
         return "neutral"
 
     def gaze_vector_to_label(self, vec):
         """Convert smoothed eye gaze vector to directional label"""
-        if not self.cfg:
+        if self.gaze_thresholds is None:
             return "Center"
             
+        left_t, right_t, top_t, down_t = self.gaze_thresholds
         dx, dy = vec
-        if dx < self.cfg["left_thresh"]:
+        if dx < left_t:
             return "Right"
-        if dx > self.cfg["right_thresh"]:
+        if dx > right_t:
             return "Left"
-        if dy < self.cfg["top_thresh"]:
+        if dy < top_t:
             return "Down"
-        if dy > self.cfg["down_thresh"]:
+        if dy > down_t:
             return "Up"
         
         return "Center"
 
-    def process_frame(self, frame):
-        """Process a single video frame and extract focus metrics"""
-        current_time = time.perf_counter()
-        
+    def process_frame(self, frame, current_time):
+        """Process a single video frame (captured at perf_counter time current_time) and extract focus metrics"""
         # Convert to RGB for MediaPipe
         h, w = frame.shape[:2]
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb)
+        small = frame
+        if w > PROCESS_WIDTH:
+            small_h = round(h * PROCESS_WIDTH / w)
+            small = self.small_buf
+            if small is None or small.shape[0] != small_h:
+                small = self.small_buf = np.empty((small_h, PROCESS_WIDTH, 3), dtype=np.uint8)
+            cv2.resize(frame, (PROCESS_WIDTH, small_h), dst=small, interpolation=cv2.INTER_AREA)
+        
+        # Motion gate: if a tiny grayscale thumbnail barely changed, reuse the last
+        # metrics instead of running FaceMesh (capped so blink/closed-eye timing stays live)
+        tiny = cv2.resize(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), MOTION_THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        still = self.prev_tiny is not None and int(cv2.absdiff(tiny, self.prev_tiny).sum()) < MOTION_THRESHOLD
+        self.prev_tiny = tiny
+        if still and self.last_metrics is not None and self.reused_frames < MOTION_MAX_REUSE:
+            self.reused_frames += 1
+            return self.last_metrics
+        self.reused_frames = 0
+        
+        # cvtColor on the downscaled frame (~0.01 ms at 480 px) beats a [..., ::-1] contiguous copy by ~40x
+        # Written into a buffer reused across frames (reallocated only if the size changes)
+        rgb = self.rgb_buf
+        if rgb is None or rgb.shape != small.shape:
+            rgb = self.rgb_buf = np.empty_like(small)
+        rgb.flags.writeable = True
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+        # Read-only input lets MediaPipe wrap the buffer instead of copying it
+        rgb.flags.writeable = False
+        # Without iris refinement while the head is turned away (see REFINE_HEAD_LIMIT)
+        refined = self.face_mesh_basic is None or not self.head_turned
+        face_mesh = self.face_mesh if refined else self.face_mesh_basic
+        results = face_mesh.process(rgb)
         
         face_present = bool(results.multi_face_landmarks)
+        bs = self.blink_state  # local binding: read/written several times per frame
         
         if face_present:
             # Use first detected face
             lm = results.multi_face_landmarks[0].landmark
-            pts = landmarks_to_np_array(lm, frame.shape)
-            
-            # Extract eye data for gaze tracking
-            right_pts = get_eye_pts(RIGHT_EYE, lm, w, h)
-            left_pts = get_eye_pts(LEFT_EYE, lm, w, h)
+            # 478 points, or 468 (no iris) from the unrefined Face-Mesh
+            pts = landmarks_to_np_array(lm, frame.shape, out=self.pts_buf[:len(lm)])
             
-            vec_r = eye_gaze_vector(right_pts)
-            vec_l = eye_gaze_vector(left_pts)
-            
-            # Average and smooth gaze vectors
-            raw_vec = (vec_r + vec_l) / 2.0
-            smoothed_vec = self.smoother.update(raw_vec)
-            self.gaze_label = self.gaze_vector_to_label(smoothed_vec)
+            # Average gaze vectors (smoothed below together with head pose);
+            # without the iris the previous gaze input is kept
+            signals = self.signals
+            if refined:
+                # Both eyes' landmarks straight from pts, (2, 5, 2) – same pixels as get_eye_pts
+                eyes = pts[EYE_LANDMARKS]
+                signals[:2] = eye_gaze_vector_batch(eyes).mean(axis=0)
             
             # Use enhanced face_track.py functions for accurate eye tracking
-            from face_track import compute_average_ear, normalize_ear, update_blink_metrics
-            
             # Get accurate Eye Aspect Ratio
             ear = compute_average_ear(pts)
-            self.eyes_open_ratio = normalize_ear(ear)
+            eyes_open_ratio = normalize_ear(ear)
             
             # Update blink metrics with proper tracking
-            (self.blink_state['blink_in_progress'], 
-             self.blink_state['blink_count'], 
-             self.blink_state['eyes_closed_start_time'], 
-             self.blink_state['eyes_closed_duration'], 
+            (bs['blink_in_progress'],
+             bs['blink_count'],
+             bs['eyes_closed_start_time'],
+             eyes_closed_duration,
              blink_detected) = update_blink_metrics(
-                self.eyes_open_ratio,
+                eyes_open_ratio,
                 current_time,
-                self.blink_state['blink_in_progress'],
-                self.blink_state['blink_count'],
-                self.blink_state['eyes_closed_start_time'],
-                self.blink_state['eyes_closed_duration']
+                bs['blink_in_progress'],
+                bs['blink_count'],
+                bs['eyes_closed_start_time'],
+                bs['eyes_closed_duration']
             )
+            bs['eyes_closed_duration'] = eyes_closed_duration
             
             # Update session blink count for rate calculation
             if blink_detected:
                 self.blink_count += 1
             
-            # Use the properly tracked eyes closed duration
-            self.eyes_closed_duration = self.blink_state['eyes_closed_duration']
-            
             # Detect expression
             self.expression = self.infer_expression(pts)
             
             # Calculate head pose using enhanced functions
-            from face_track import estimate_head_orientation
             head_orientation = estimate_head_orientation(pts, (h, w))
             if head_orientation:
-                head_pitch, head_yaw = head_orientation
+                signals[2], signals[3] = head_orientation
             else:
-                head_pitch, head_yaw = 0.0, 0.0
+                signals[2] = signals[3] = 0.0
             
-            # Store in history for smoothing
-            self.head_pitch_history.append(head_pitch)
-            self.head_yaw_history.append(head_yaw)
+            # One EMA update for gaze and head pose
+            smoothed = self.smoother.update(signals)
+            gaze_label = self.gaze_vector_to_label(smoothed[:2])
+            head_pitch = float(smoothed[2])
+            head_yaw = float(smoothed[3])
+            limit = REFINE_HEAD_RESUME if self.head_turned else REFINE_HEAD_LIMIT
+            self.head_turned = abs(head_pitch) > limit or abs(head_yaw) > limit
             
             # Determine gaze away ratio
-            gaze_away_ratio = 0.0 if self.gaze_label == "Center" else 1.0
+            gaze_away_ratio = 0.0 if gaze_label == "Center" else 1.0
             
         else:
             # No face detected
-            self.eyes_open_ratio = 0.0
-            self.eyes_closed_duration = 0.0
+            eyes_open_ratio = 0.0
+            eyes_closed_duration = 0.0
             self.expression = None
-            self.gaze_label = "Away"
+            gaze_label = "Away"
             gaze_away_ratio = 1.0
             head_pitch = 0.0
             head_yaw = 0.0
+            self.head_turned = False
+        self.eyes_open_ratio = eyes_open_ratio
+        self.eyes_closed_duration = eyes_closed_duration
+        self.gaze_label = gaze_label
         
         # Calculate blink rate using the enhanced tracking
-        time_elapsed = current_time - self.blink_state.get('last_reset_time', self.session_start_time)
+        blink_count = bs['blink_count']
+        time_elapsed = current_time - bs['last_reset_time']
         if time_elapsed >= 60.0:  # Reset every minute
-            blink_rate = (self.blink_state['blink_count'] / time_elapsed) * 60.0
-            self.blink_state['blink_count'] = 0
-            self.blink_state['last_reset_time'] = current_time
+            blink_rate = (blink_count / time_elapsed) * 60.0
+            bs['blink_count'] = 0
+            bs['last_reset_time'] = current_time
         else:
             # Estimate current rate
-            blink_rate = (self.blink_state['blink_count'] / max(time_elapsed, 1.0)) * 60.0
+            blink_rate = (blink_count / max(time_elapsed, 1.0)) * 60.0
         
-        return {
+        self.last_metrics = {
             'face_present': face_present,
-            'eyes_open_ratio': self.eyes_open_ratio,
-            'eyes_closed_duration': self.eyes_closed_duration,
-            'gaze_direction': self.gaze_label,
+            'eyes_open_ratio': eyes_open_ratio,
+            'eyes_closed_duration': eyes_closed_duration,
+            'gaze_direction': gaze_label,
             'gaze_away_ratio': gaze_away_ratio,
             'head_pitch': head_pitch,
             'head_yaw': head_yaw,
             'blink_rate': blink_rate,
             'expression': self.expression,
-            'landmarks_array': pts if face_present else None,
+            # Copy: pts_buf is refilled by the next analysed frame while this one may still be drawn
+            'landmarks_array': pts.copy() if face_present else None,
             'frame_shape': (h, w)
         }
+        return self.last_metrics
 
-    def compute_and_update_focus_score(self, metrics, landmarks_array=None, frame_shape=None):
-        """Compute focus score using enhanced FocusScore.py functions and update backend if needed"""
+    def compute_and_update_focus_score(self, metrics, current_time):
+        """
+        Accumulate per-frame metrics; once per update_interval (current_time is the
+        frame's perf_counter time), score their averages with
+        FocusScore.compute_focus_score and queue the result for the backend
+        """
         try:
-            current_time = time.perf_counter()
+            sums = self.metric_sums
+            for key in AVERAGED_METRICS:
+                sums[key] += metrics[key]
+            gaze = metrics['gaze_direction']
+            self.gaze_counts[gaze] = self.gaze_counts.get(gaze, 0) + 1
+            self.eyes_closed_max = max(self.eyes_closed_max, metrics['eyes_closed_duration'])
+            self.metric_frames += 1
             
-            # Use enhanced face tracking if landmarks are available
-            if landmarks_array is not None and frame_shape is not None:
-                new_focus_score, self.blink_state = compute_focus_score_with_landmarks(
-                    landmarks_array=landmarks_array,
-                    frame_shape=frame_shape,
-                    gaze_direction=metrics['gaze_direction'],
-                    gaze_away_ratio=metrics['gaze_away_ratio'],
-                    current_time=current_time,
-                    prev_score=self.current_focus_score,
-                    blink_state=self.blink_state,
-                    face_present=metrics['face_present']
-                )
-            else:
-                # Fallback to original method
-                new_focus_score = compute_focus_score(
-                    face_present=metrics['face_present'],
-                    eyes_open_ratio=metrics['eyes_open_ratio'],
-                    eyes_closed_duration=metrics['eyes_closed_duration'],
-                    gaze_direction=metrics['gaze_direction'],
-                    gaze_away_ratio=metrics['gaze_away_ratio'],
-                    head_pitch=metrics['head_pitch'],
-                    head_yaw=metrics['head_yaw'],
-                    blink_rate=metrics['blink_rate'],
-                    keys_per_30s=0,  # Not tracking typing in this implementation
-                    typing_active=False,  # Not tracking typing in this implementation
-                    focus_trend=0.0,  # Could be enhanced to track trend
-                    prev_score=self.current_focus_score
-                )
+            if current_time - self.last_update_time < self.update_interval:
+                return
+            self.last_update_time = current_time
+            
+            n = self.metric_frames
+            avg = {key: sums[key] / n for key in AVERAGED_METRICS}
+            eyes_closed_max = self.eyes_closed_max  # the accumulators are reset below
+            new_focus_score = compute_focus_score(
+                face_present=avg['face_present'] >= 0.5,  # face seen in most frames
+                eyes_open_ratio=avg['eyes_open_ratio'],
+                eyes_closed_duration=eyes_closed_max,
+                gaze_direction=max(self.gaze_counts, key=self.gaze_counts.get),  # most frequent label
+                gaze_away_ratio=avg['gaze_away_ratio'],
+                head_pitch=avg['head_pitch'],
+                head_yaw=avg['head_yaw'],
+                blink_rate=avg['blink_rate'],
+                keys_per_30s=0,  # Not tracking typing in this implementation
+                typing_active=False,  # Not tracking typing in this implementation
+                focus_trend=0.0,  # Could be enhanced to track trend
+                prev_score=self.current_focus_score
+            )
+            self.reset_metric_accumulators()
             
             # Only print score changes if significant (>2 point change)
             if abs(new_focus_score - self.current_focus_score) > 2.0:
                 print(f"🎯 Focus score: {self.current_focus_score:.1f} → {new_focus_score:.1f}")
-            
-            # Debug: Print eye tracking details every few seconds
-            if abs(new_focus_score - self.current_focus_score) > 2.0:
-                print(f"👁️ Eye openness: {metrics['eyes_open_ratio']:.3f}, Eyes closed: {metrics['eyes_closed_duration']:.2f}s, Blinks: {self.blink_state['blink_count']}")
+                print(f"👁️ Eye openness: {avg['eyes_open_ratio']:.3f}, Eyes closed: {eyes_closed_max:.2f}s, Blinks: {self.blink_state['blink_count']}")
             
             self.current_focus_score = new_focus_score
             
-            # Send update to backend
-            current_time = time.time()
-            if current_time - self.last_update_time >= self.update_interval:
-                self.send_focus_update(new_focus_score)
-                self.last_update_time = current_time
-                
-                # Check if we should trigger a motivational quote
-                self.check_quote_thresholds(new_focus_score)
+            # Queue the backend update, then check if we should trigger a motivational quote
+            self.send_focus_update(new_focus_score)
+            self.check_quote_thresholds(new_focus_score)
             
         except Exception as e:
             print(f"❌ Error computing focus score: {e}")
 
+    def reset_metric_accumulators(self):
+        """Start a new averaging window for compute_and_update_focus_score"""
+        self.metric_sums = dict.fromkeys(AVERAGED_METRICS, 0.0)
+        self.gaze_counts = {}
+        self.eyes_closed_max = 0.0
+        self.metric_frames = 0
+
+    def network_loop(self):
+        """Network thread: POST queued backend calls off the video loop"""
+        while True:
+            item = self.http_queue.get()
+            if item is None:
+                break
+            endpoint, payload, success_message = item
+            try:
+                response = self.session.post(f"{self.backend_url}{endpoint}", json=payload, timeout=HTTP_TIMEOUT)
+                if response.status_code == 200:
+                    print(success_message)
+                else:
+                    print(f"⚠️ Backend call {endpoint} failed: {response.status_code}")
+            except requests.exceptions.RequestException as e:
+                print(f"🔌 Backend connection failed: {e}")
+
+    def post_async(self, endpoint, payload, success_message):
+        """Queue a POST for the network thread (drops the oldest pending call if the queue is full)"""
+        put_drop_oldest(self.http_queue, (endpoint, payload, success_message))
+
+    def inference_loop(self):
+        """
+        Inference thread: FaceMesh + metrics + focus scoring for the frames handed over by
+        run(), so the display loop never waits on the model. Results are published in
+        self.last_metrics (a new dict per analysed frame, never mutated afterwards).
+        """
+        while True:
+            item = self.inference_queue.get()
+            if item is None:
+                break
+            frame, frame_time = item
+            try:
+                metrics = self.process_frame(frame, frame_time)
+            except Exception as e:
+                print(f"❌ Error processing frame: {e}")
+                continue
+            
+            # Accumulate metrics; the focus score is computed once per update interval
+            self.compute_and_update_focus_score(metrics, frame_time)
+
+    def capture_loop(self):
+        """
+        Capture thread: grab() every frame so the driver never backs up, but only
+        retrieve() (decode) the latest one when the processing loop asks for it.
+        A video file has no real-time pacing, so there every frame is read and queued
+        (blocking) instead: nothing is skipped and the run lasts the whole video.
+        """
+        if not self.live:
+            while self.running:
+                ret, frame = self.cap.read()
+                self.put_while_running(self.frame_queue, frame if ret else None)
+                if not ret:
+                    break
+            return
+        while self.running:
+            if not self.cap.grab():
+                self.offer_frame(None)  # None tells the processing loop the stream ended
+                break
+            if self.frame_wanted.is_set():
+                self.frame_wanted.clear()
+                # Decode into the same array every time: the processing loop only asks for a
+                # new frame once it is done with the previous one (imshow keeps its own copy)
+                ret, frame = self.cap.retrieve(self.frame_buf)
+                if ret:
+                    self.frame_buf = frame
+                self.offer_frame(frame if ret else None)
+                if not ret:
+                    break
+
+    def put_while_running(self, q, item):
+        """Blocking put() that gives up once the tracker stops"""
+        while self.running:
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def offer_frame(self, frame):
+        """Put a frame in frame_queue, dropping the unconsumed one if it is full"""
+        put_drop_oldest(self.frame_queue, frame)
+
     def send_focus_update(self, focus_score):
         """Send focus score update to backend"""
-        try:
-            response = requests.post(f"{self.backend_url}/update-focus-score", 
-                                   json={"focus_score": focus_score}, 
-                                   timeout=1.0)
-            if response.status_code == 200:
-                print(f"📊 Focus score updated: {focus_score:.1f}")
-            else:
-                print(f"⚠️ Failed to update backend: {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"🔌 Backend connection failed: {e}")
+        self.post_async("/update-focus-score", {"focus_score": focus_score},
+                        f"📊 Focus score updated: {focus_score:.1f}")
 
     def check_quote_thresholds(self, focus_score):
         """Check if focus score has crossed thresholds and trigger quotes accordingly"""
-        thresholds = [80, 60, 50, 40, 20]  # Define your threshold levels
-        
-        for threshold in thresholds:
-            # Check if we've crossed below this threshold since last quote
-            if focus_score < threshold and self.last_quote_threshold >= threshold:
-                self.trigger_motivational_quote(threshold)
-                self.last_quote_threshold = threshold
-                break
+        # Only the next un-triggered threshold can fire; skip past every level the
+        # score is already below so one drop gives one quote, not one per update
+        idx = self.next_quote_idx
+        while idx < len(QUOTE_THRESHOLDS) and focus_score < QUOTE_THRESHOLDS[idx]:
+            idx += 1
+        if idx != self.next_quote_idx:
+            self.next_quote_idx = idx
+            self.last_quote_threshold = QUOTE_THRESHOLDS[idx - 1]
+            self.trigger_motivational_quote(self.last_quote_threshold)
         
         # Reset threshold tracking if score improves significantly
         if focus_score > self.last_quote_threshold + 10:
             self.last_quote_threshold = 100
+            self.next_quote_idx = 0
 
     def trigger_motivational_quote(self, threshold):
         """Trigger a motivational quote via the backend"""
-        try:
-            print(f"🚨 Focus dropped below {threshold}% - triggering motivational quote!")
-            response = requests.post(f"{self.backend_url}/trigger-auto-motivation", 
-                                   json={"threshold": threshold, "focus_score": self.current_focus_score}, 
-                                   timeout=3.0)
-            if response.status_code == 200:
-                print("💪 Motivational quote triggered successfully")
-            else:
-                print(f"⚠️ Failed to trigger quote: {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"🔌 Failed to trigger motivation: {e}")
+        print(f"🚨 Focus dropped below {threshold}% - triggering motivational quote!")
+        self.post_async("/trigger-auto-motivation",
+                        {"threshold": threshold, "focus_score": self.current_focus_score},
+                        "💪 Motivational quote triggered successfully")
 
     def draw_overlay(self, frame, metrics):
         """Draw focus tracking overlay on video frame"""
@@ -398,62 +659,31 @@ class FaceFocusTracker:
         if metrics['face_present'] and metrics.get('landmarks_array') is not None:
             pts = metrics['landmarks_array']
             
-            # Draw key facial landmarks (green dots like in face_track.py)
-            # Eye corners and vertical points - Green for eye tracking
-            for idx in (159, 145, 386, 374, 33, 133, 362, 263):
-                cv2.circle(frame, tuple(pts[idx].astype(int)), 2, (0, 255, 0), -1)
+            # Landmark dots: one polylines call per group instead of one cv2.circle per point
+            for segment_indices, thickness, color, needed in OVERLAY_DOT_SEGMENTS:
+                if len(pts) < needed:
+                    continue
+                cv2.polylines(frame, pts[segment_indices].reshape(-1, 2, 2), False, color, thickness)
             
-            # Mouth corners and center points - Green 
-            for idx in (61, 291, 13, 14):
-                cv2.circle(frame, tuple(pts[idx].astype(int)), 2, (0, 255, 0), -1)
-            
-            # Head pose landmarks - Red for head tracking
-            for idx in [1, 152, 33, 263, 61, 291]:  # HEAD_POSE_LANDMARKS
-                cv2.circle(frame, tuple(pts[idx].astype(int)), 3, (0, 0, 255), -1)
-            
-            # Face contour points - Blue for face boundary
-            face_contour = [10, 151, 9, 8, 168, 6, 148, 176, 149, 150, 136, 172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109]
-            for idx in face_contour[::3]:  # Every 3rd point to avoid clutter
-                cv2.circle(frame, tuple(pts[idx].astype(int)), 1, (255, 0, 0), -1)
-            
-            # Nose tip and bridge - Yellow for nose tracking
-            for idx in [1, 2, 5, 4, 6, 19, 20, 94, 125]:
-                cv2.circle(frame, tuple(pts[idx].astype(int)), 2, (0, 255, 255), -1)
-            
-            # Draw eye regions if available
-            try:
-                from face_tracking_utils import RIGHT_EYE, LEFT_EYE, get_eye_pts
-                h, w = frame.shape[:2]
-                
-                # Convert landmarks to format expected by get_eye_pts
-                lm_list = []
-                for point in pts:
-                    lm_list.append(type('obj', (object,), {'x': point[0]/w, 'y': point[1]/h})())
-                
-                # Draw eye points
-                right_pts = get_eye_pts(RIGHT_EYE, lm_list, w, h)
-                left_pts = get_eye_pts(LEFT_EYE, lm_list, w, h)
-                
-                for pt in (right_pts["outer"], right_pts["inner"], right_pts["iris"],
-                          left_pts["outer"], left_pts["inner"], left_pts["iris"]):
-                    cv2.circle(frame, tuple(pt.astype(int)), 2, (255, 255, 0), -1)  # Cyan for eyes
-            except Exception as e:
-                # Fallback to basic eye landmark drawing if get_eye_pts fails
-                pass
-            
-        # Draw HUD information
-        hud_lines = [
-            f"Face: {'Yes' if metrics['face_present'] else 'No'}",
-            f"Focus Score: {self.current_focus_score:.1f}%",
-            f"Expression: {metrics['expression'] or '--'}",
-            f"Eye openness: {metrics['eyes_open_ratio']:.3f}",
-            f"Eyes closed: {metrics['eyes_closed_duration']:.2f}s",
-            f"Blink rate: {metrics['blink_rate']:.1f}/min",
-            f"Blink count: {self.blink_state['blink_count']}",
-            f"Gaze: {metrics['gaze_direction']}",
-            f"Head pitch: {metrics['head_pitch']:.1f}°",
-            f"Head yaw: {metrics['head_yaw']:.1f}°"
-        ]
+        # Draw HUD information (formatted at the precision that is worth redrawing for).
+        # Metrics only change on analysed frames (PROCESS_FPS), so the strings are rebuilt
+        # only for a new metrics dict or focus score, not on every displayed frame
+        if metrics is not self.hud_metrics or self.current_focus_score != self.hud_score:
+            self.hud_metrics = metrics
+            self.hud_score = self.current_focus_score
+            self.hud_text = (
+                f"Face: {'Yes' if metrics['face_present'] else 'No'}",
+                f"Focus Score: {self.current_focus_score:.1f}%",
+                f"Expression: {metrics['expression'] or '--'}",
+                f"Eye openness: {metrics['eyes_open_ratio']:.2f}",
+                f"Eyes closed: {metrics['eyes_closed_duration']:.1f}s",
+                f"Blink rate: {metrics['blink_rate']:.1f}/min",
+                f"Blink count: {self.blink_state['blink_count']}",
+                f"Gaze: {metrics['gaze_direction']}",
+                f"Head pitch: {metrics['head_pitch']:.1f}°",
+                f"Head yaw: {metrics['head_yaw']:.1f}°"
+            )
+        hud_lines = self.hud_text
         
         # Color code based on focus score
         if self.current_focus_score >= 80:
@@ -465,31 +695,79 @@ class FaceFocusTracker:
         else:
             color = (0, 0, 255)  # Red
         
-        y = 30
+        # Re-rasterize only what changed (whole layer on a new color/frame size, otherwise
+        # just the changed text lines), then blit the cached layer
+        hud_key = (color, frame.shape)
+        if hud_key != self.hud_key:
+            self.render_hud(hud_lines, color, frame.shape)
+            self.hud_key = hud_key
+        elif hud_lines != self.hud_lines:
+            self.update_hud_lines(hud_lines, color)
+        hud_h, hud_w = self.hud_mask.shape
+        cv2.copyTo(self.hud_layer, self.hud_mask, frame[:hud_h, :hud_w])
+
+    def render_hud(self, hud_lines, color, frame_shape):
+        """Draw the HUD text and focus bar into hud_layer, with hud_mask marking the drawn pixels"""
+        hud_h, hud_w = min(frame_shape[0], HUD_HEIGHT), min(frame_shape[1], HUD_WIDTH)
+        if self.hud_layer is None or self.hud_layer.shape[:2] != (hud_h, hud_w):
+            self.hud_layer = np.zeros((hud_h, hud_w, 3), dtype=np.uint8)
+        else:
+            self.hud_layer.fill(0)
+        layer = self.hud_layer
+        
+        y = HUD_FIRST_BASELINE
         for line in hud_lines:
-            cv2.putText(frame, line, (30, y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
-            y += 30
+            cv2.putText(layer, line, (30, y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2, cv2.LINE_8)
+            y += HUD_LINE_HEIGHT
+        self.draw_focus_bar(color)
         
-        # Draw focus score bar
+        # HUD colors are never pure black, so any non-zero pixel was drawn
+        self.hud_mask = layer.any(axis=2).view(np.uint8)
+        self.hud_lines = hud_lines
+
+    def update_hud_lines(self, hud_lines, color):
+        """Redraw only the HUD lines that differ from the cached layer (and the bar with the score)"""
+        layer = self.hud_layer
+        mask = self.hud_mask
+        for i, (line, old_line) in enumerate(zip(hud_lines, self.hud_lines)):
+            if line == old_line:
+                continue
+            # Each line owns the 30 px band from 24 px above its baseline to 6 px below,
+            # which holds ascenders and descenders of FONT_HERSHEY_SIMPLEX at scale 0.8
+            y = HUD_FIRST_BASELINE + i * HUD_LINE_HEIGHT
+            band = layer[y - 24:y + 6]
+            band.fill(0)
+            cv2.putText(layer, line, (30, y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2, cv2.LINE_8)
+            mask[y - 24:y + 6] = band.any(axis=2)
+        if hud_lines[1] != self.hud_lines[1]:  # focus score line -> bar fill changed too
+            bar_top, bar_bottom = self.draw_focus_bar(color)
+            mask[bar_top:bar_bottom] = layer[bar_top:bar_bottom].any(axis=2)
+        self.hud_lines = hud_lines
+
+    def draw_focus_bar(self, color):
+        """Draw the focus score bar below the HUD text; returns the (top, bottom) rows it covers"""
+        layer = self.hud_layer
         bar_width = 300
         bar_height = 20
         bar_x = 30
-        bar_y = y + 10
+        bar_y = HUD_FIRST_BASELINE + (HUD_LINES - 1) * HUD_LINE_HEIGHT + 40
         
         # Background bar
-        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (50, 50, 50), -1)
+        cv2.rectangle(layer, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (50, 50, 50), -1)
         
         # Fill bar based on focus score
         fill_width = int((self.current_focus_score / 100.0) * bar_width)
-        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + fill_width, bar_y + bar_height), color, -1)
+        cv2.rectangle(layer, (bar_x, bar_y), (bar_x + fill_width, bar_y + bar_height), color, -1)
         
         # Border
-        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (255, 255, 255), 2)
+        cv2.rectangle(layer, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (255, 255, 255), 2)
+        return bar_y - 1, bar_y + bar_height + 2
 
     def run(self, source=0):
         """Main tracking loop"""
         print("🚀 Starting FaceFocusTracker...")
         
+        cv2.setNumThreads(OPENCV_THREADS)
         if not self.initialize_camera(source):
             return False
         
@@ -499,33 +777,62 @@ class FaceFocusTracker:
         # Initialize blink state with current time
         self.blink_state['last_reset_time'] = self.session_start_time
         
+        self.capture_thread = threading.Thread(target=self.capture_loop, daemon=True)
+        self.inference_thread = threading.Thread(target=self.inference_loop, daemon=True)
+        self.network_thread = threading.Thread(target=self.network_loop, daemon=True)
+        self.capture_thread.start()
+        self.inference_thread.start()
+        self.network_thread.start()
+        
         print("📹 Face tracking started - monitoring focus...")
         print("Press ESC to stop tracking")
         
+        frame_count = 0
+        last_processed = -PROCESS_INTERVAL
+        
         try:
             while self.running:
-                ret, frame = self.cap.read()
-                if not ret:
+                if self.live and not self.show_video:
+                    # Headless: nothing to display between analyses, so don't even fetch those frames
+                    wait = last_processed + PROCESS_INTERVAL - time.perf_counter()
+                    if wait > 0:
+                        time.sleep(wait)
+                self.frame_wanted.set()
+                try:
+                    frame = self.frame_queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                if frame is None:
                     print("📹 Video stream ended")
                     break
                 
-                # Process frame and get focus metrics
-                metrics = self.process_frame(frame)
+                frame_count += 1
                 
-                # Compute and update focus score with enhanced landmarks
-                self.compute_and_update_focus_score(
-                    metrics, 
-                    landmarks_array=metrics.get('landmarks_array'),
-                    frame_shape=metrics.get('frame_shape')
-                )
+                # Hand at most PROCESS_FPS frames a second to the inference thread (a copy:
+                # the capture thread decodes the next frame into the same buffer, and the
+                # overlay is drawn on this one). Video files analyse every frame, waiting
+                # for the inference thread rather than dropping
+                frame_start = time.perf_counter()
+                if not self.live:
+                    self.put_while_running(self.inference_queue, (frame.copy(), frame_start))
+                elif frame_start - last_processed >= PROCESS_INTERVAL:
+                    last_processed = frame_start
+                    put_drop_oldest(self.inference_queue, (frame.copy(), frame_start))
                 
-                # Draw overlay if video display is enabled
+                # Draw overlay if video display is enabled, with the latest finished metrics
                 if self.show_video:
-                    self.draw_overlay(frame, metrics)
+                    metrics = self.last_metrics
+                    if metrics is not None:
+                        self.draw_overlay(frame, metrics)
                     cv2.imshow("FocusMind - AI Focus Tracker", frame)
                     
-                    # Check for ESC key
-                    if cv2.waitKey(1) & 0xFF == 27:
+                    # Check for ESC key: pollKey pumps GUI events without waitKey's 1 ms
+                    # sleep; a real waitKey every KEY_WAIT_EVERY frames (~0.3 s at 30 fps)
+                    if frame_count % KEY_WAIT_EVERY == 0:
+                        key = cv2.waitKey(1)
+                    else:
+                        key = cv2.pollKey()
+                    if key & 0xFF == 27:
                         break
                 
         except KeyboardInterrupt:
@@ -538,8 +845,25 @@ class FaceFocusTracker:
     def stop(self):
         """Stop the tracker and cleanup resources"""
         self.running = False
+        if self.capture_thread:
+            self.capture_thread.join(timeout=2.0)
+        if self.inference_thread:
+            try:
+                # Let a video file's last queued frame finish before the thread exits
+                self.inference_queue.put(None, timeout=0.0 if self.live else 5.0)
+            except queue.Full:
+                put_drop_oldest(self.inference_queue, None)
+            self.inference_thread.join(timeout=5.0)
+        if self.network_thread:
+            put_drop_oldest(self.http_queue, None)
+            self.network_thread.join(timeout=5.0)
         if self.cap:
             self.cap.release()
+        if self.face_mesh:
+            self.face_mesh.close()
+        if self.face_mesh_basic:
+            self.face_mesh_basic.close()
+        self.session.close()
         if self.show_video:
             cv2.destroyAllWindows()
         print("🛑 FaceFocusTracker stopped")
@@ -552,6 +876,9 @@ def main():
     parser.add_argument("--no-video", action="store_true", help="Run without video display (headless)")
     parser.add_argument("--demo", action="store_true", help="Run in demo mode without camera (simulates focus tracking)")
     parser.add_argument("--calibrate", action="store_true", help="Force gaze calibration (otherwise uses defaults/saved)")
+    parser.add_argument("--landmarker", default=None, help="Path to face_landmarker.task (use the MediaPipe Tasks API instead of FaceMesh)")
+    parser.add_argument("--gpu", action="store_true", help="Run the Face Landmarker task on the GPU delegate (needs --landmarker)")
+    parser.add_argument("--inference-process", action="store_true", help="Run the face model in a separate worker process")
     
     args = parser.parse_args()
     
@@ -563,7 +890,10 @@ def main():
         backend_url=args.backend,
         update_interval=args.interval,
         show_video=not args.no_video,
-        force_calibrate=args.calibrate
+        force_calibrate=args.calibrate,
+        landmarker_model=args.landmarker,
+        use_gpu=args.gpu,
+        inference_process=args.inference_process
     )
     
     success = tracker.run(source)
@@ -0,0 +1,77 @@
+"""
+FaceMesh-compatible wrapper around the MediaPipe Tasks FaceLandmarker.
+
+The Tasks runtime can run the landmark model on the GPU delegate, which the legacy
+mp.solutions.face_mesh path cannot. FaceLandmarkerMesh.process() returns the same
+shape of result as FaceMesh.process() (results.multi_face_landmarks[0].landmark),
+so the tracker and calibration code work with either backend unchanged.
+
+The model bundle is not shipped with the repo; download face_landmarker.task from
+https://developers.google.com/mediapipe/solutions/vision/face_landmarker
+Any Face Landmarker bundle works, including float16/int8 quantized ones, which run
+faster on CPU (XNNPACK); landmarks are only used at whole-pixel precision here.
+"""
+
+import time
+from types import SimpleNamespace
+
+import mediapipe as mp
+from mediapipe.tasks import python as mp_python
+from mediapipe.tasks.python import vision
+
+
+def _create_landmarker(model_path, delegate):
+    options = vision.FaceLandmarkerOptions(
+        base_options=mp_python.BaseOptions(model_asset_path=model_path, delegate=delegate),
+        # VIDEO, not LIVE_STREAM: the tracker already runs inference on its own thread,
+        # overlapped with capture and display, and needs each frame's result synchronously
+        # to score it; detect_async + callback would only add a second hand-off
+        running_mode=vision.RunningMode.VIDEO,
+        num_faces=1,
+        min_face_detection_confidence=0.5,
+        min_face_presence_confidence=0.5,
+        min_tracking_confidence=0.5,
+        output_face_blendshapes=False,
+        output_facial_transformation_matrixes=False,
+    )
+    return vision.FaceLandmarker.create_from_options(options)
+
+
+class FaceLandmarkerMesh:
+    """
+    Drop-in replacement for mp.solutions.face_mesh.FaceMesh backed by the Tasks API.
+    Returns 478 landmarks (iris included), like FaceMesh(refine_landmarks=True).
+    """
+
+    def __init__(self, model_path="face_landmarker.task", use_gpu=False):
+        self.delegate = "CPU"
+        self.landmarker = None
+        if use_gpu:
+            try:
+                self.landmarker = _create_landmarker(model_path, mp_python.BaseOptions.Delegate.GPU)
+                self.delegate = "GPU"
+            except (RuntimeError, NotImplementedError) as e:
+                # No usable GPU/driver for the delegate on this machine
+                print(f"⚠️ GPU delegate unavailable ({e}), falling back to CPU")
+        if self.landmarker is None:
+            self.landmarker = _create_landmarker(model_path, mp_python.BaseOptions.Delegate.CPU)
+        # VIDEO mode requires strictly increasing timestamps (ms)
+        self.last_ts_ms = -1
+
+    def process(self, rgb):
+        """Run the landmarker on an RGB uint8 frame; FaceMesh.process() result shape"""
+        ts_ms = int(time.perf_counter() * 1000)
+        if ts_ms <= self.last_ts_ms:
+            ts_ms = self.last_ts_ms + 1
+        self.last_ts_ms = ts_ms
+
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        result = self.landmarker.detect_for_video(image, ts_ms)
+        if not result.face_landmarks:
+            return SimpleNamespace(multi_face_landmarks=None)
+        return SimpleNamespace(
+            multi_face_landmarks=[SimpleNamespace(landmark=lms) for lms in result.face_landmarks]
+        )
+
+    def close(self):
+        self.landmarker.close()
@@ -0,0 +1,159 @@
+"""
+Run the MediaPipe face model in a worker process.
+
+FaceMeshProcess.process() has the same call/result shape as FaceMesh.process(), but the
+graph runs in a child process: the frame goes over in a shared-memory segment, the
+landmarks come back in a second one, and only a tiny request/"n landmarks" message
+crosses the pipe. The tracker's capture and display threads then never compete with
+MediaPipe's Python wrapper for the GIL.
+"""
+
+import multiprocessing
+from collections import namedtuple
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+# FaceMesh(refine_landmarks=True) and the Face Landmarker task both return 478 points
+MAX_LANDMARKS = 478
+
+# Same attribute access as a MediaPipe NormalizedLandmark (lm.x, lm.y, lm.z)
+Landmark = namedtuple("Landmark", "x y z")
+
+
+def create_face_mesh(landmarker_model=None, use_gpu=False, refine_landmarks=True):
+    """
+    Tasks FaceLandmarker (optionally on GPU) when a model bundle is given, otherwise the legacy CPU Face-Mesh.
+    refine_landmarks=False (legacy Face-Mesh only) skips the iris sub-model: 468 points, no 468-477.
+    """
+    if landmarker_model:
+        from face_landmarker import FaceLandmarkerMesh
+        return FaceLandmarkerMesh(landmarker_model, use_gpu=use_gpu)
+
+    import mediapipe as mp  # ~1 s import, only paid once a face model is actually needed
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        # The gaze vector is the iris centre (landmarks 468/473) inside the eye box,
+        # and the iris sub-model is what produces landmarks 468-477
+        refine_landmarks=refine_landmarks,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+    )
+
+
+def _worker(conn, landmarks_name, landmarker_model, use_gpu):
+    landmarks_shm = shared_memory.SharedMemory(name=landmarks_name)
+    landmarks = np.ndarray((MAX_LANDMARKS, 3), dtype=np.float32, buffer=landmarks_shm.buf)
+    frame_shm = None
+    try:
+        face_mesh = create_face_mesh(landmarker_model, use_gpu)
+    except Exception as e:
+        conn.send(e)
+        del landmarks
+        landmarks_shm.close()
+        return
+    conn.send(getattr(face_mesh, "delegate", "CPU"))
+
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            kind, arg = msg
+            if kind == "frame":
+                # The parent grew the frame segment; attach to the new one
+                if frame_shm is not None:
+                    frame_shm.close()
+                frame_shm = shared_memory.SharedMemory(name=arg)
+                continue
+
+            rgb = np.ndarray(arg, dtype=np.uint8, buffer=frame_shm.buf)
+            rgb.flags.writeable = False
+            results = face_mesh.process(rgb)
+            del rgb
+            n = 0
+            if results.multi_face_landmarks:
+                lms = results.multi_face_landmarks[0].landmark
+                n = min(len(lms), MAX_LANDMARKS)
+                landmarks[:n] = [(l.x, l.y, l.z) for l in lms[:n]]
+            conn.send(n)
+    except EOFError:
+        pass  # parent went away
+    finally:
+        face_mesh.close()
+        del landmarks
+        landmarks_shm.close()
+        if frame_shm is not None:
+            frame_shm.close()
+
+
+class FaceMeshProcess:
+    """
+    Drop-in replacement for FaceMesh / FaceLandmarkerMesh that runs the model in a
+    separate process. process() blocks until that frame's landmarks are back.
+    """
+
+    def __init__(self, landmarker_model=None, use_gpu=False):
+        # spawn, not fork: the parent already has OpenCV/capture threads running
+        ctx = multiprocessing.get_context("spawn")
+        self.landmarks_shm = shared_memory.SharedMemory(create=True, size=MAX_LANDMARKS * 3 * 4)
+        self.landmarks = np.ndarray((MAX_LANDMARKS, 3), dtype=np.float32, buffer=self.landmarks_shm.buf)
+        self.frame_shm = None  # created on the first frame, regrown if a bigger one arrives
+
+        self.conn, child_conn = ctx.Pipe()
+        self.worker = ctx.Process(
+            target=_worker,
+            args=(child_conn, self.landmarks_shm.name, landmarker_model, use_gpu),
+            daemon=True,
+        )
+        self.worker.start()
+        child_conn.close()
+
+        # The worker reports the delegate in use, or the exception that stopped the model loading
+        try:
+            ready = self.conn.recv()
+        except EOFError:
+            ready = RuntimeError(f"face model worker exited with code {self.worker.exitcode}")
+        if isinstance(ready, Exception):
+            self.close()
+            raise ready
+        self.delegate = ready
+
+    def process(self, rgb):
+        """Run the face model on an RGB uint8 frame; FaceMesh.process() result shape"""
+        if self.frame_shm is None or self.frame_shm.size < rgb.nbytes:
+            old = self.frame_shm
+            self.frame_shm = shared_memory.SharedMemory(create=True, size=rgb.nbytes)
+            self.conn.send(("frame", self.frame_shm.name))
+            if old is not None:
+                # The worker may still have it mapped; unlinking only drops the name
+                old.close()
+                old.unlink()
+
+        np.ndarray(rgb.shape, dtype=np.uint8, buffer=self.frame_shm.buf)[...] = rgb
+        self.conn.send(("process", rgb.shape))
+        n = self.conn.recv()
+        if not n:
+            return SimpleNamespace(multi_face_landmarks=None)
+        lms = list(map(Landmark._make, self.landmarks[:n].tolist()))
+        return SimpleNamespace(multi_face_landmarks=[SimpleNamespace(landmark=lms)])
+
+    def close(self):
+        if self.worker.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.worker.join(timeout=5.0)
+            if self.worker.is_alive():
+                self.worker.terminate()
+        self.conn.close()
+        del self.landmarks
+        self.landmarks_shm.close()
+        self.landmarks_shm.unlink()
+        if self.frame_shm is not None:
+            self.frame_shm.close()
+            self.frame_shm.unlink()
+            self.frame_shm = None
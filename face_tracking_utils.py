@@ -1,4 +1,6 @@
 # import cv2
+from operator import attrgetter
+
 import numpy as np
 from typing import Tuple, Dict
 
@@ -18,14 +20,34 @@ LEFT_EYE = {
     "iris":  473,
 }
 
+# Both eyes as one index table, rows = (right, left), columns = EYE_KEYS order.
+EYE_KEYS = ("outer", "inner", "upper", "lower", "iris")
+EYE_LANDMARKS = np.array(
+    [[RIGHT_EYE[k] for k in EYE_KEYS], [LEFT_EYE[k] for k in EYE_KEYS]],
+    dtype=np.intp,
+)
+
+_get_x = attrgetter("x")
+_get_y = attrgetter("y")
+
 
-def landmarks_to_np_array(landmarks, img_shape):
+def landmarks_to_np_array(landmarks, img_shape, out=None):
+    """
+    Pixel (x, y) of every landmark as an (N, 2) int32 array.
+    Pass a preallocated (N, 2) int32 `out` to fill it in place instead of allocating.
+    """
     h, w = img_shape[:2]
-    points = np.array(
-        [(int(l.x * w), int(l.y * h)) for l in landmarks],
-        dtype=np.int32,
-    )
-    return points
+    n = len(landmarks)
+    if out is None or len(out) != n:
+        out = np.empty((n, 2), dtype=np.int32)
+    # One C-level pass per axis instead of 2N int() calls and N tuples. The scaled values
+    # are written straight into the int32 columns; the unsafe float -> int32 cast
+    # truncates toward zero exactly like int()
+    xs = np.fromiter(map(_get_x, landmarks), dtype=np.float64, count=n)
+    ys = np.fromiter(map(_get_y, landmarks), dtype=np.float64, count=n)
+    np.multiply(xs, w, out=out[:, 0], casting="unsafe")
+    np.multiply(ys, h, out=out[:, 1], casting="unsafe")
+    return out
 
 
 def norm_to_px(lm, w: int, h: int) -> Tuple[int, int]:
@@ -47,6 +69,17 @@ def get_eye_pts(idx_map: Dict[str, int], lm, w: int, h: int) -> Dict[str, Tuple[
     }
 
 
+def get_eyes_pts(lm, w: int, h: int) -> np.ndarray:
+    """
+    Pixel coordinates of the five landmarks of both eyes, shape (2, 5, 2):
+    (right, left) x EYE_KEYS x (x, y). Same rounding as get_eye_pts.
+    """
+    return np.array(
+        [[norm_to_px(lm[i], w, h) for i in eye] for eye in EYE_LANDMARKS.tolist()],
+        dtype=np.int32,
+    )
+
+
 def eye_gaze_vector(pts: Dict[str, Tuple[int, int]]) -> np.ndarray:
     """
     Return normalized (dx, dy) of the iris centre inside its eye box.
@@ -68,4 +101,20 @@ def eye_gaze_vector(pts: Dict[str, Tuple[int, int]]) -> np.ndarray:
     # print('pts["iris"][1]: ', pts["iris"][1])
     # print('pts["upper"][0]: ', pts["upper"][0])
     # print("eye_h: ", eye_h)
-    return np.array([dx, dy])
\ No newline at end of file
+    return np.array([dx, dy])
+
+
+def eye_gaze_vector_batch(eyes: np.ndarray) -> np.ndarray:
+    """
+    Vectorized eye_gaze_vector: `eyes` is (B, 5, 2) in EYE_KEYS order, returns (B, 2).
+    Eyes with a zero-width or zero-height box get (0.5, 0.5), like the scalar version.
+    """
+    outer, inner, upper, lower, iris = (eyes[:, i] for i in range(5))
+    eye_w = inner[:, 0] - outer[:, 0]
+    eye_h = lower[:, 1] - upper[:, 1]
+    valid = (eye_w != 0) & (eye_h != 0)
+
+    out = np.full((eyes.shape[0], 2), 0.5)
+    np.divide(iris[:, 0] - outer[:, 0], eye_w, out=out[:, 0], where=valid)
+    np.divide(iris[:, 1] - upper[:, 1], eye_h, out=out[:, 1], where=valid)
+    return out
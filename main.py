@@ -1,6 +1,6 @@
+import asyncio
 import os
-import subprocess
-import json
+from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
@@ -16,6 +16,10 @@ import random
 # ---- Your own modules -------------------------------------------------
 from FocusScore import generate_focus_chart_base64, generate_session_stats
 from face_focus_tracker import FaceFocusTracker
+# Called in-process (on a worker thread) instead of spawning `nudge.py` per request
+from nudge import (
+    break_nudge, clamp_attention_score, generate_audio, notification_nudge, voice_nudge
+)
 # ---------------------------------------------------------------------
 
 # Global state ---------------------------------------------------------
@@ -23,6 +27,14 @@ attention_score = 100
 focus_score_history = []
 face_tracker = None
 tracking_active = False
+
+# /motivation quotes are generated ahead of time: the prompt never changes, so a
+# request can take a ready quote instead of waiting 1-3 s on the API. Each quote is
+# served once and the pool is topped up in the background when it runs low.
+MOTIVATION_POOL_SIZE = 5
+MOTIVATION_POOL_REFILL_AT = 2
+motivation_pool = []
+motivation_refill_task = None
 # ---------------------------------------------------------------------
 
 # Load .env ------------------------------------------------------------
@@ -30,9 +42,18 @@ load_dotenv()
 # ---------------------------------------------------------------------
 
 # --------------------------- FastAPI app -------------------------------
+@asynccontextmanager
+async def lifespan(app):
+    # Fill the motivation pool while the server starts, so the first /motivation
+    # request already finds a quote waiting
+    start_motivation_refill()
+    yield
+
+
 app = FastAPI(
     title="FocusMind API",
-    description="Motivational Study Coach API"
+    description="Motivational Study Coach API",
+    lifespan=lifespan,
 )
 
 # --------------------------- Static mounts -----------------------------
@@ -93,6 +114,43 @@ class VoiceAudioRequest(BaseModel):
 # All other endpoints stay exactly as you wrote them.
 # (Only the doc‑string/comments have been trimmed for brevity.)
 
+def generate_motivation():
+    """One coach quote from the API (blocking; run it off the event loop)."""
+    response = client.chat.completions.create(
+        model="gpt-4",
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You are a study coach loosely inspired by David Goggins. "
+                    "Give intense, motivational study advice in a strictly PG version "
+                    "of his style. (No swearing). Keep it under 30 words."
+                ),
+            },
+            {"role": "user", "content": "Give me motivation to study hard"},
+        ],
+        max_tokens=150,
+    )
+    return response.choices[0].message.content
+
+
+async def refill_motivation_pool():
+    while len(motivation_pool) < MOTIVATION_POOL_SIZE:
+        try:
+            motivation_pool.append(await asyncio.to_thread(generate_motivation))
+        except Exception as e:
+            # Requests fall back to generating their own quote until the next refill
+            print(f"⚠️ Motivation pool refill failed: {e}")
+            return
+
+
+def start_motivation_refill():
+    """Start a background pool refill unless one is already running"""
+    global motivation_refill_task
+    if motivation_refill_task is None or motivation_refill_task.done():
+        motivation_refill_task = asyncio.create_task(refill_motivation_pool())
+
+
 @app.get("/motivation", response_model=MotivationResponse)
 async def get_motivation(reset: bool = False):
     """Get a motivational quote from a David‑Goggins‑style coach."""
@@ -109,28 +167,22 @@ async def get_motivation(reset: bool = False):
         )
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a study coach loosely inspired by David Goggins. "
-                        "Give intense, motivational study advice in a strictly PG version "
-                        "of his style. (No swearing). Keep it under 30 words."
-                    ),
-                },
-                {"role": "user", "content": "Give me motivation to study hard"},
-            ],
-            max_tokens=150,
-        )
-        msg = response.choices[0].message.content
-        return MotivationResponse(message=msg, attention_score=attention_score)
+        if motivation_pool:
+            msg = motivation_pool.pop(0)
+        else:
+            msg = await asyncio.to_thread(generate_motivation)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error generating motivation: {str(e)}"
         )
 
+    # Top up only after a successful call: while the API is failing, each failed
+    # request would otherwise start another refill that fails the same way
+    if len(motivation_pool) < MOTIVATION_POOL_REFILL_AT:
+        start_motivation_refill()
+
+    return MotivationResponse(message=msg, attention_score=attention_score)
+
 
 @app.get("/attention-score")
 async def get_attention_score():
@@ -199,16 +251,7 @@ async def get_focus_session_stats():
 async def get_voice_nudge():
     global attention_score
     try:
-        result = subprocess.run(
-            ["py", "nudge.py", "voice", str(attention_score)],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__)),
-        )
-        if result.returncode != 0:
-            raise RuntimeError(result.stderr)
-
-        data = json.loads(result.stdout.strip())
+        data = await asyncio.to_thread(voice_nudge, clamp_attention_score(attention_score))
         if not data.get("success"):
             raise RuntimeError(data.get("error", "Unknown error"))
 
@@ -224,8 +267,6 @@ async def get_voice_nudge():
             "nudge_type": "voice",
             "attention_score": attention_score,
         }
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500, detail=f"JSON parse error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Voice nudge error: {str(e)}")
 
@@ -233,16 +274,7 @@ async def get_voice_nudge():
 @app.post("/generate-voice-audio")
 async def generate_voice_audio(request: VoiceAudioRequest):
     try:
-        result = subprocess.run(
-            ["py", "nudge.py", "generate_audio", request.message],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__)),
-        )
-        if result.returncode != 0:
-            raise RuntimeError(result.stderr)
-
-        data = json.loads(result.stdout.strip())
+        data = await asyncio.to_thread(generate_audio, request.message)
         if not data.get("success"):
             raise RuntimeError(data.get("error", "Unknown error"))
 
@@ -256,8 +288,6 @@ async def generate_voice_audio(request: VoiceAudioRequest):
             "audio_file": audio_file,
             "source": "David Goggins AI",
         }
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500, detail=f"JSON parse error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Audio generation error: {str(e)}")
 
@@ -266,16 +296,7 @@ async def generate_voice_audio(request: VoiceAudioRequest):
 async def get_notification_nudge():
     global attention_score
     try:
-        result = subprocess.run(
-            ["py", "nudge.py", "notification", str(attention_score)],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__)),
-        )
-        if result.returncode != 0:
-            raise RuntimeError(result.stderr)
-
-        data = json.loads(result.stdout.strip())
+        data = await asyncio.to_thread(notification_nudge, clamp_attention_score(attention_score))
         if not data.get("success"):
             raise RuntimeError(data.get("error", "Unknown error"))
 
@@ -286,8 +307,6 @@ async def get_notification_nudge():
             "nudge_type": "notification",
             "platform": data.get("platform", "unknown"),
         }
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500, detail=f"JSON parse error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Notification nudge error: {str(e)}")
 
@@ -295,16 +314,7 @@ async def get_notification_nudge():
 @app.post("/get-break-nudge")
 async def get_break_nudge():
     try:
-        result = subprocess.run(
-            ["py", "nudge.py", "break"],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__)),
-        )
-        if result.returncode != 0:
-            raise RuntimeError(result.stderr)
-
-        data = json.loads(result.stdout.strip())
+        data = await asyncio.to_thread(break_nudge)
         if not data.get("success"):
             raise RuntimeError(data.get("error", "Unknown error"))
 
@@ -319,8 +329,6 @@ async def get_break_nudge():
             "source": data.get("source", "David Goggins Break Coach"),
             "nudge_type": "break",
         }
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500, detail=f"JSON parse error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Break nudge error: {str(e)}")
 
@@ -368,16 +376,7 @@ async def trigger_auto_motivation(request: AutoMotivationTrigger):
             f"🚨 Auto‑motivation triggered! Focus dropped below {request.threshold}% "
             f"(current: {request.focus_score:.1f}%)"
         )
-        result = subprocess.run(
-            ["py", "nudge.py", "voice", str(int(request.focus_score))],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__)),
-        )
-        if result.returncode != 0:
-            raise RuntimeError(result.stderr)
-
-        data = json.loads(result.stdout.strip())
+        data = await asyncio.to_thread(voice_nudge, clamp_attention_score(request.focus_score))
         if not data.get("success"):
             raise RuntimeError(data.get("error", "Unknown error"))
 
@@ -394,8 +393,6 @@ async def trigger_auto_motivation(request: AutoMotivationTrigger):
             "threshold": request.threshold,
             "focus_score": request.focus_score,
         }
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500, detail=f"JSON parse error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Auto‑motivation error: {str(e)}")
 
@@ -14,8 +14,10 @@ load_dotenv()
 # Initialize OpenAI client
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
-    print(json.dumps({"error": "OPENAI_API_KEY not found in environment variables"}))
-    exit(1)
+    if __name__ == "__main__":
+        print(json.dumps({"error": "OPENAI_API_KEY not found in environment variables"}))
+        exit(1)
+    raise ValueError("OPENAI_API_KEY environment variable is required")
 
 client = OpenAI(api_key=api_key)
 
@@ -24,7 +26,7 @@ audio_dir = Path("audio_files")
 audio_dir.mkdir(exist_ok=True)
 
 def break_nudge():
-    """Generate a motivational break message with voiceover using OpenAI for Pomodoro breaks"""
+    """Generate a motivational break message with voiceover using OpenAI for Pomodoro breaks; returns the result dict"""
     try:
         system_prompt = """You are David Goggins giving advice for taking a productive break during Pomodoro sessions.
 
@@ -75,8 +77,7 @@ Examples: "Break time! Get up, stretch those muscles, hydrate your body. Real re
         # Save audio file
         tts_response.stream_to_file(audio_path)
         
-        # Return as JSON for easy parsing
-        result = {
+        return {
             "success": True,
             "message": message,
             "audio_file": audio_filename,
@@ -85,18 +86,15 @@ Examples: "Break time! Get up, stretch those muscles, hydrate your body. Real re
             "nudge_type": "break"
         }
         
-        print(json.dumps(result))
-        
     except Exception as e:
-        error_result = {
+        return {
             "success": False,
             "error": str(e),
             "nudge_type": "break"
         }
-        print(json.dumps(error_result))
 
 def voice_nudge(attention_score=100):
-    """Generate a motivational quote with voiceover using OpenAI based on attention score"""
+    """Generate a motivational quote with voiceover using OpenAI based on attention score; returns the result dict"""
     try:
         # Create dynamic system prompt based on attention score
         if attention_score >= 80:
@@ -166,8 +164,7 @@ Keep it under {max_words}."""
         # Save audio file
         tts_response.stream_to_file(audio_path)
         
-        # Return as JSON for easy parsing
-        result = {
+        return {
             "success": True,
             "message": message,
             "audio_file": audio_filename,
@@ -176,18 +173,15 @@ Keep it under {max_words}."""
             "nudge_type": "voice"
         }
         
-        print(json.dumps(result))
-        
     except Exception as e:
-        error_result = {
+        return {
             "success": False,
             "error": str(e),
             "nudge_type": "voice"
         }
-        print(json.dumps(error_result))
 
 def notification_nudge(attention_score=100):
-    """Send a system notification to get user's attention based on attention score"""
+    """Send a system notification to get user's attention based on attention score; returns the result dict"""
     try:
         # Create dynamic system prompt based on attention score
         if attention_score >= 80:
@@ -244,8 +238,7 @@ Be direct and motivating but adjust intensity based on how low the attention sco
             # print(f"NOTIFICATION: {message}")
             pass
         
-        # Return as JSON for easy parsing
-        result = {
+        return {
             "success": True,
             "message": message,
             "source": "AI Notification",
@@ -253,15 +246,45 @@ Be direct and motivating but adjust intensity based on how low the attention sco
             "platform": sys.platform
         }
         
-        print(json.dumps(result))
-        
     except Exception as e:
-        error_result = {
+        return {
             "success": False,
             "error": str(e),
             "nudge_type": "notification"
         }
-        print(json.dumps(error_result))
+
+def generate_audio(message):
+    """Convert a given message to speech with OpenAI TTS; returns the result dict"""
+    try:
+        audio_filename = f"message_{uuid.uuid4()}.mp3"
+        audio_path = audio_dir / audio_filename
+        
+        # Use OpenAI TTS to generate speech
+        response = client.audio.speech.create(
+            model="tts-1",
+            voice="onyx",  # David Goggins-like voice
+            input=message,
+            speed=1.0
+        )
+        
+        # Save audio file
+        response.stream_to_file(audio_path)
+        
+        return {
+            "success": True,
+            "message": message,
+            "audio_file": audio_filename,
+            "source": "David Goggins AI"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+def clamp_attention_score(attention_score):
+    """Attention score as an int in 0-100 (the API keeps it as a float)"""
+    return max(0, min(100, int(attention_score)))
 
 if __name__ == "__main__":
     # Check command line arguments to determine which nudge to run
@@ -271,59 +294,40 @@ if __name__ == "__main__":
     
     if len(sys.argv) > 1:
         nudge_type = sys.argv[1]
-    
-    if nudge_type == "generate_audio":
+
+    if nudge_type == "serve":
+        # Long-lived mode used by FocusScore.NudgeWorker: each request is b"<length>\n<json>" on stdin
+        # and gets exactly one JSON line back. The voice nudge is pitched at the session's
+        # last focus score (default 100 when the session has no stats yet).
+        while True:
+            header = sys.stdin.buffer.readline()
+            if not header:
+                break
+            session_payload = json.loads(sys.stdin.buffer.read(int(header)))
+            last_score = session_payload.get("session_stats", {}).get("last_score", attention_score)
+            print(json.dumps(voice_nudge(clamp_attention_score(last_score))))
+    elif nudge_type == "generate_audio":
         # For generate_audio, the second argument is the message to convert to audio
         if len(sys.argv) > 2:
-            message = sys.argv[2]
-            try:
-                # Generate audio for the provided message
-                audio_filename = f"message_{uuid.uuid4()}.mp3"
-                audio_path = audio_dir / audio_filename
-                
-                # Use OpenAI TTS to generate speech
-                response = client.audio.speech.create(
-                    model="tts-1",
-                    voice="onyx",  # David Goggins-like voice
-                    input=message,
-                    speed=1.0
-                )
-                
-                # Save audio file
-                response.stream_to_file(audio_path)
-                
-                result = {
-                    "success": True,
-                    "message": message,
-                    "audio_file": audio_filename,
-                    "source": "David Goggins AI"
-                }
-                print(json.dumps(result))
-            except Exception as e:
-                error_result = {
-                    "success": False,
-                    "error": str(e)
-                }
-                print(json.dumps(error_result))
+            print(json.dumps(generate_audio(sys.argv[2])))
         else:
             print(json.dumps({"error": "Message required for generate_audio command"}))
     else:
         # Original logic for other commands
         if len(sys.argv) > 2:
             try:
-                attention_score = int(sys.argv[2])
                 # Ensure attention score is within valid range
-                attention_score = max(0, min(100, attention_score))
+                attention_score = clamp_attention_score(sys.argv[2])
             except ValueError:
                 print(json.dumps({"error": "Attention score must be a number between 0 and 100"}))
                 exit(1)
         
         if nudge_type == "voice":
-            voice_nudge(attention_score)
+            print(json.dumps(voice_nudge(attention_score)))
         elif nudge_type == "notification":
-            notification_nudge(attention_score)
+            print(json.dumps(notification_nudge(attention_score)))
         elif nudge_type == "break":
-            break_nudge()  # Break nudges don't need attention score
+            print(json.dumps(break_nudge()))  # Break nudges don't need attention score
         else:
             print(json.dumps({"error": f"Unknown nudge type: {nudge_type}. Use 'voice', 'notification', 'break', or 'generate_audio'"}))
             exit(1)
\ No newline at end of file